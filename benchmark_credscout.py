@@ -0,0 +1,178 @@
+"""Time each CredScout pipeline stage on synthetic scrapes and record peak memory as JSON"""
+import argparse
+import io
+import json
+import os
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+import plotly
+import pyarrow as pa
+import credscout_charts as charts
+import credscout_core as core
+from generate_cpe_data import DATASET_SIZES, generate_raw_csv, parse_size
+from preprocess_cpe_data import preprocess_file
+
+DEFAULT_OUTPUT = 'credscout_benchmark.json'
+DEFAULT_DATA_DIR = 'benchmark_data'
+NO_LIMIT = (-np.inf, np.inf)
+
+# Filter states timed for every dataset: (name, search, selects, price range, duration range)
+FILTER_SCENARIOS = [
+    ('all_rows', '', {}, NO_LIMIT, NO_LIMIT),
+    ('search', 'data', {}, NO_LIMIT, NO_LIMIT),
+    ('search_and_filters', 'management', {'offering_level': 'certificate'}, (0, 2000), NO_LIMIT),
+    ('filters_only', '', {'delivery_mode': 'Online', 'data_quality': 'good'}, (500, 5000), (1, 26)),
+]
+
+def measure(func, repeat, track_memory):
+    """(result, stage record) for func: best and all wall times, plus traced peak memory
+
+    Peak memory comes from a separate tracemalloc run, since tracing slows the timed runs.
+    It covers Python and numpy/pandas allocations, not Arrow's memory pool.
+    """
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        times.append(time.perf_counter() - started)
+    record = {'seconds': min(times), 'runs': times}
+    if track_memory:
+        del result
+        tracemalloc.start()
+        result = func()
+        record['peak_memory_mb'] = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return result, record
+
+def benchmark_dataset(raw_path, data_dir, repeat=1, track_memory=True, log=print):
+    """Stage records for one raw scrape, run in dashboard order"""
+    stages = []
+
+    def stage(name, func):
+        result, record = measure(func, repeat, track_memory)
+        stages.append({'stage': name, **record})
+        memory = f", peak {record['peak_memory_mb']:,.0f} MB" if track_memory else ''
+        log(f"  {name:<36} {record['seconds']:8.3f}s{memory}")
+        return result
+
+    with open(raw_path, 'rb') as f:
+        raw_bytes = f.read()
+    processed_path = os.path.join(data_dir, f"{os.path.splitext(os.path.basename(raw_path))[0]}.processed.csv")
+
+    df, _ = stage('clean_raw_upload', lambda data=raw_bytes: core.process_upload(io.BytesIO(data)))
+    del raw_bytes
+    stage('preprocess_cli', lambda: preprocess_file(raw_path, processed_path))
+
+    def load_processed():
+        with open(processed_path, 'rb') as f:
+            return core.process_upload(f)
+
+    stage('load_processed_csv', load_processed)
+
+    search_index = stage('build_search_index', lambda: core.SearchIndex(df))
+    skill_table = stage('build_skill_table', lambda: core.SkillTable(df['skills']))
+    filter_engine = stage('build_filter_engine', lambda: core.FilterEngine(df))
+    stage('build_program_lookup', lambda: core.ProgramLookup(df))
+    stage('extract_top_skills', lambda: core.extract_top_skills(skill_table, top_n=20))
+    stage('estimate_unique_programs', lambda: core.estimate_unique_programs(df))
+
+    for name, search, selects, price_range, duration_range in FILTER_SCENARIOS:
+        filter_state = core.normalize_filter_state(search, selects, price_range, duration_range)
+
+        def resolve_filters():
+            # Start from empty caches, so every run resolves the search and filters
+            search_index.token_cache.clear()
+            return core.select_filtered(filter_engine, search_index, core.SelectionCache(), filter_state)
+
+        rows, _ = stage(f'filter_{name}', resolve_filters)
+        filtered_df = df.iloc[rows]
+        stage(f'market_overview_{name}', lambda: charts.market_overview_content(filtered_df))
+        stage(f'skills_figure_{name}', lambda: charts.skills_content(skill_table, rows))
+        stage(f'competitive_{name}', lambda: charts.competitive_content(filter_engine, rows, filtered_df))
+        # A new sort index per run, so its lazily built order is part of the timing; 100 rows
+        # is the explorer's default page size
+        stage(f'explorer_page_{name}', lambda: core.explorer_page(
+            df, core.SortIndex(df).sort(rows, 'price_cad', True)[:100]
+        ))
+    return {'rows': len(df), 'raw_bytes': os.path.getsize(raw_path), 'stages': stages}
+
+def environment():
+    """Interpreter, machine and library versions, to tell runs apart"""
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'pyarrow': pa.__version__,
+        'plotly': plotly.__version__,
+    }
+
+def compare(results, baseline):
+    """Lines of per-stage time ratios against a baseline results file"""
+    lines = []
+    for dataset in results['datasets']:
+        previous = next((d for d in baseline['datasets'] if d['rows'] == dataset['rows']), None)
+        if previous is None:
+            continue
+        before = {stage['stage']: stage['seconds'] for stage in previous['stages']}
+        lines.append(f"{dataset['rows']:,} rows vs baseline:")
+        for stage in dataset['stages']:
+            if before.get(stage['stage']):
+                ratio = stage['seconds'] / before[stage['stage']]
+                lines.append(f"  {stage['stage']:<36} {before[stage['stage']]:8.3f}s -> {stage['seconds']:8.3f}s ({ratio:.2f}x)")
+    return lines
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        'sizes', nargs='*', type=parse_size, default=[DATASET_SIZES['10k'], DATASET_SIZES['100k']],
+        help=f"dataset sizes: {', '.join(DATASET_SIZES)} or row counts (default: 10k 100k)"
+    )
+    parser.add_argument('-o', '--output', default=DEFAULT_OUTPUT, help=f'JSON results file (default: {DEFAULT_OUTPUT})')
+    parser.add_argument(
+        '--data-dir', default=DEFAULT_DATA_DIR,
+        help=f'where generated scrapes are kept and reused (default: {DEFAULT_DATA_DIR})'
+    )
+    parser.add_argument('--repeat', type=int, default=1, help='timed runs per stage; the best is reported (default: 1)')
+    parser.add_argument('--no-memory', action='store_true', help='skip the traced run that measures peak memory')
+    parser.add_argument('--baseline', help='earlier results file to compare stage times against')
+    args = parser.parse_args(argv)
+    if args.repeat < 1:
+        parser.error('--repeat must be at least 1')
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    results = {
+        'created': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'environment': environment(),
+        'repeat': args.repeat,
+        'datasets': [],
+    }
+    for rows in args.sizes:
+        raw_path = os.path.join(args.data_dir, f"raw_{rows}.csv")
+        if not os.path.exists(raw_path):
+            print(f"Generating {rows:,} rows into {raw_path}")
+            generate_raw_csv(raw_path, rows)
+        print(f"Benchmarking {rows:,} rows")
+        results['datasets'].append(benchmark_dataset(raw_path, args.data_dir, args.repeat, not args.no_memory))
+
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    results['max_rss_mb'] = max_rss / (2**20 if sys.platform == 'darwin' else 2**10)
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Wrote {args.output} (process peak RSS {results['max_rss_mb']:,.0f} MB)")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            print('\n'.join(compare(results, json.load(f))))
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
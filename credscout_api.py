@@ -0,0 +1,287 @@
+"""Serve CredScout filter and aggregate queries over a local HTTP/JSON API"""
+import argparse
+import json
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+import numpy as np
+from credscout_core import (
+    FILTER_COLUMNS, RANGE_FILTER_COLUMNS, STAGE_TIMINGS, timed, load_processed, SearchIndex,
+    SkillTable, FilterEngine, SelectionCache, normalize_filter_state, select_filtered,
+    cached_tab_content, ranked_counts, numeric_summary
+)
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8502
+# Aggregates a query can ask for; all of them by default
+QUERY_AGGREGATES = ['summary', 'offering_levels', 'institutions', 'skills', 'price', 'duration']
+QUERY_FIELDS = {'search', 'filters', 'price_range', 'duration_range', 'aggregates', 'top_n'}
+# Ranked aggregates are cached at API_MAX_TOP_N entries and cut down to each query's top_n
+DEFAULT_TOP_N = 10
+API_MAX_TOP_N = 100
+MAX_BATCH_QUERIES = 100
+MAX_BODY_BYTES = 2**20
+# Prices and durations are stored as float32, so widened values carry noise past the
+# cents (829.43 comes out as 829.4299926757812); responses round it away
+JSON_FLOAT_DECIMALS = 2
+# GET /query parameters for the ends of the numeric ranges
+RANGE_PARAMS = {
+    'price_min': ('price_range', 0), 'price_max': ('price_range', 1),
+    'duration_min': ('duration_range', 0), 'duration_max': ('duration_range', 1),
+}
+
+def json_value(value):
+    """A number as plain JSON: numpy scalars unwrapped, NaN as null, floats rounded"""
+    if isinstance(value, (float, np.floating)):
+        return None if np.isnan(value) else round(float(value), JSON_FLOAT_DECIMALS)
+    if isinstance(value, np.integer):
+        return int(value)
+    return value
+
+def parse_range(value, name):
+    """(low, high) from a [low, high] list, where null or a missing list means unbounded"""
+    if value is None:
+        return (-np.inf, np.inf)
+    if not isinstance(value, list) or len(value) != 2:
+        raise ValueError(f"{name} must be a [low, high] list")
+    low, high = value
+    try:
+        return (-np.inf if low is None else float(low), np.inf if high is None else float(high))
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} bounds must be numbers or null")
+
+def parse_query(spec):
+    """(filter state, aggregates, top_n) of a query object, raising ValueError when it is invalid"""
+    if not isinstance(spec, dict):
+        raise ValueError('a query must be a JSON object')
+    unknown = sorted(set(spec) - QUERY_FIELDS)
+    if unknown:
+        raise ValueError(f"unknown query fields: {', '.join(unknown)}")
+
+    search = spec.get('search') or ''
+    if not isinstance(search, str):
+        raise ValueError('search must be a string')
+    filters = spec.get('filters') or {}
+    if not isinstance(filters, dict):
+        raise ValueError('filters must be an object')
+    for column, value in filters.items():
+        if column not in FILTER_COLUMNS:
+            raise ValueError(f"cannot filter on {column!r}; use one of {', '.join(FILTER_COLUMNS)}")
+        if not isinstance(value, str):
+            raise ValueError(f"the {column} filter must be a string")
+
+    aggregates = spec.get('aggregates', QUERY_AGGREGATES)
+    if not isinstance(aggregates, list) or not set(aggregates) <= set(QUERY_AGGREGATES):
+        raise ValueError(f"aggregates must be a list drawn from {', '.join(QUERY_AGGREGATES)}")
+    try:
+        top_n = int(spec.get('top_n', DEFAULT_TOP_N))
+    except (TypeError, ValueError):
+        raise ValueError('top_n must be an integer')
+    if not 1 <= top_n <= API_MAX_TOP_N:
+        raise ValueError(f"top_n must be between 1 and {API_MAX_TOP_N}")
+
+    filter_state = normalize_filter_state(
+        search, filters,
+        parse_range(spec.get('price_range'), 'price_range'),
+        parse_range(spec.get('duration_range'), 'duration_range'),
+    )
+    return filter_state, aggregates, top_n
+
+def query_spec_from_params(params):
+    """Query object for GET /query parameters, e.g. ?search=python&offering_level=course&price_max=2000"""
+    spec = {'filters': {}}
+    for name, values in params.items():
+        value = values[-1]
+        if name == 'search':
+            spec['search'] = value
+        elif name in FILTER_COLUMNS:
+            spec['filters'][name] = value
+        elif name == 'aggregates':
+            spec['aggregates'] = value.split(',')
+        elif name == 'top_n':
+            spec['top_n'] = value
+        elif name in RANGE_PARAMS:
+            field, end = RANGE_PARAMS[name]
+            spec.setdefault(field, [None, None])[end] = value
+        else:
+            raise ValueError(f"unknown parameter {name!r}")
+    return spec
+
+class CatalogService:
+    """Processed catalog held in memory with its indexes, answering filter + aggregate queries
+
+    Row selections and aggregates are cached per filter state in one SelectionCache shared
+    by every client, so repeated and batched queries only pay for what is new.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        with timed('build_indexes'):
+            self.search_index = SearchIndex(df)
+            self.skill_table = SkillTable(df['skills'])
+            self.filter_engine = FilterEngine(df)
+            self.selection_cache = SelectionCache()
+
+    def aggregate(self, name, rows):
+        """One aggregate of a row selection, ranked lists holding API_MAX_TOP_N entries"""
+        if name == 'offering_levels':
+            return ranked_counts(self.filter_engine, 'offering_level', rows)
+        if name == 'institutions':
+            return ranked_counts(self.filter_engine, 'institution', rows, API_MAX_TOP_N)
+        if name == 'skills':
+            return self.skill_table.most_common(rows, API_MAX_TOP_N)
+        if name == 'price':
+            return numeric_summary(self.filter_engine, 'price_cad', rows)
+        return numeric_summary(self.filter_engine, 'duration_weeks', rows)
+
+    def query(self, spec):
+        """Aggregates of the programs matching a query object"""
+        filter_state, aggregates, top_n = parse_query(spec)
+        rows, summary = select_filtered(self.filter_engine, self.search_index, self.selection_cache, filter_state)
+        result = {}
+        for name in aggregates:
+            if name == 'summary':
+                result[name] = {key: json_value(value) for key, value in summary.items()}
+                continue
+            content = cached_tab_content(
+                self.selection_cache, filter_state, f'api_{name}', lambda: self.aggregate(name, rows)
+            )
+            if isinstance(content, list):
+                result[name] = [{'value': value, 'count': count} for value, count in content[:top_n]]
+            else:
+                result[name] = {key: json_value(value) for key, value in content.items()}
+        return result
+
+    def batch(self, specs):
+        """Results of several queries in order; an invalid query gets an error entry instead"""
+        if not isinstance(specs, list) or len(specs) > MAX_BATCH_QUERIES:
+            raise ValueError(f"queries must be a list of at most {MAX_BATCH_QUERIES} query objects")
+        results = []
+        for spec in specs:
+            try:
+                results.append(self.query(spec))
+            except ValueError as e:
+                results.append({'error': str(e)})
+        return results
+
+    def options(self):
+        """Values of each filter column and bounds of each numeric range"""
+        return {
+            'filters': {column: self.filter_engine.options(column) for column in FILTER_COLUMNS},
+            'ranges': {
+                column: [json_value(bound) for bound in self.filter_engine.bounds(column) or (None, None)]
+                for column in RANGE_FILTER_COLUMNS
+            },
+        }
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """JSON endpoints over the server's CatalogService
+
+    GET  /health              programs loaded
+    GET  /options             filter values and numeric bounds
+    GET  /query?search=...    one query from URL parameters
+    POST /query               one query object
+    POST /batch               {"queries": [query objects]}
+    GET  /timings             stage latency percentiles
+    """
+
+    # Keep-alive, so clients can send many queries over one connection; headers and body go
+    # out as separate writes, which Nagle's algorithm would hold back for a delayed ACK
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        service = self.server.service
+        if url.path == '/health':
+            self.send_json(200, {'status': 'ok', 'programs': len(service.df)})
+        elif url.path == '/options':
+            self.send_json(200, service.options())
+        elif url.path == '/query':
+            self.respond('api_query', lambda: service.query(query_spec_from_params(parse_qs(url.query))))
+        elif url.path == '/timings':
+            summary = STAGE_TIMINGS.summary()
+            self.send_json(200, [
+                {key: json_value(value) for key, value in record.items()} for record in summary.to_dict('records')
+            ])
+        else:
+            self.send_json(404, {'error': f"no endpoint {url.path}"})
+
+    def do_POST(self):
+        service = self.server.service
+        path = urlsplit(self.path).path
+        if path == '/query':
+            self.respond('api_query', lambda: service.query(self.read_json()))
+        elif path == '/batch':
+            self.respond('api_batch', lambda: {'results': service.batch(self.read_json().get('queries'))})
+        else:
+            self.send_json(404, {'error': f"no endpoint {path}"})
+
+    def respond(self, stage, answer):
+        """Send answer() as JSON, or a 400 with the message of a ValueError"""
+        try:
+            with timed(stage):
+                payload = answer()
+        except ValueError as e:
+            self.send_json(400, {'error': str(e)})
+            return
+        self.send_json(200, payload)
+
+    def read_json(self):
+        """Request body parsed as a JSON object"""
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > MAX_BODY_BYTES:
+            raise ValueError(f"request bodies are limited to {MAX_BODY_BYTES:,} bytes")
+        try:
+            body = json.loads(self.rfile.read(length) or b'{}')
+        except json.JSONDecodeError as e:
+            raise ValueError(f"invalid JSON: {e}")
+        if not isinstance(body, dict):
+            raise ValueError('the request body must be a JSON object')
+        return body
+
+    def send_json(self, status, payload):
+        body = json.dumps(payload, allow_nan=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # Per-request lines would cost more than most queries; latencies go to /timings instead
+        pass
+
+class QueryServer(ThreadingHTTPServer):
+    """One thread per connection, with a listen backlog for bursts of new clients"""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+def make_server(service, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """Threaded HTTP server answering queries from service"""
+    server = QueryServer((host, port), QueryHandler)
+    server.service = service
+    return server
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('input', help='processed CSV, or a headerless raw scrape to clean on start-up')
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f'interface to listen on (default: {DEFAULT_HOST})')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'port to listen on (default: {DEFAULT_PORT})')
+    args = parser.parse_args(argv)
+
+    with timed('load_data'), open(args.input, 'rb') as f:
+        df, _ = load_processed(f)
+    server = make_server(CatalogService(df), args.host, args.port)
+    print(f"Serving {len(df):,} programs on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
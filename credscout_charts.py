@@ -0,0 +1,252 @@
+"""Plotly figures for the dashboard tabs, built from core selections"""
+import pandas as pd
+import numpy as np
+import plotly.express as px
+import plotly.graph_objects as go
+from credscout_core import grouped_box_stats
+
+# Point counts where the Price vs. Duration chart switches representation: SVG markers,
+# then WebGL, then WebGL without per-point hover text, then binned density
+SCATTER_SVG_MAX_POINTS = 2_000
+SCATTER_HOVER_MAX_POINTS = 20_000
+SCATTER_WEBGL_MAX_POINTS = 100_000
+# (duration, price) bins for the density view
+DENSITY_BINS = (80, 60)
+
+def price_duration_density(durations, prices, bins=DENSITY_BINS):
+    """Heatmap of program counts over duration and price bins, binned with NumPy"""
+    counts, duration_edges, price_edges = np.histogram2d(durations, prices, bins=bins)
+    counts = np.where(counts > 0, counts, np.nan).T
+    return go.Figure(go.Heatmap(
+        x=(duration_edges[:-1] + duration_edges[1:]) / 2,
+        y=(price_edges[:-1] + price_edges[1:]) / 2,
+        z=counts,
+        colorscale=[[0, '#dbeafe'], [1, '#1e40af']],
+        colorbar=dict(title='Programs'),
+        hovertemplate='~%{x:.0f} weeks, ~$%{y:,.0f}<br>%{z:,.0f} programs<extra></extra>'
+    ))
+
+def price_duration_figure(filtered_df):
+    """Price vs. duration chart sized to the data; returns (figure or None, note)"""
+    durations = filtered_df['duration_weeks'].to_numpy(dtype='float64', na_value=np.nan)
+    prices = filtered_df['price_cad'].to_numpy(dtype='float64', na_value=np.nan)
+    has_both = ~np.isnan(durations) & ~np.isnan(prices)
+    durations, prices = durations[has_both], prices[has_both]
+    if len(prices) == 0:
+        return None, None
+
+    if len(prices) > SCATTER_WEBGL_MAX_POINTS:
+        fig_scatter = price_duration_density(durations, prices)
+        note = (
+            f"Density of {len(prices):,} programs. Narrow the price or duration range, or search, "
+            f"to {SCATTER_WEBGL_MAX_POINTS:,} or fewer to see individual programs."
+        )
+    else:
+        scatter_df = filtered_df.loc[has_both, ['duration_weeks', 'price_cad', 'offering_level', 'title', 'institution']]
+        with_hover = len(scatter_df) <= SCATTER_HOVER_MAX_POINTS
+        fig_scatter = px.scatter(
+            scatter_df,
+            x='duration_weeks',
+            y='price_cad',
+            color='offering_level',
+            size='price_cad',
+            hover_data=['title', 'institution'] if with_hover else None,
+            render_mode='svg' if len(scatter_df) <= SCATTER_SVG_MAX_POINTS else 'webgl',
+            color_discrete_sequence=['#3b82f6', '#8b5cf6', '#ec4899', '#f59e0b', '#10b981']
+        )
+        note = None if with_hover else (
+            f"Program details on hover appear once {SCATTER_HOVER_MAX_POINTS:,} or fewer programs are shown."
+        )
+    fig_scatter.update_layout(
+        xaxis_title="Duration (weeks)",
+        yaxis_title="Price (CAD)",
+        height=400,
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(family='Inter', color='#374151'),
+        xaxis=dict(gridcolor='#f3f4f6'),
+        yaxis=dict(gridcolor='#f3f4f6'),
+        legend=dict(
+            title="",
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        )
+    )
+    return fig_scatter, note
+
+def market_overview_content(filtered_df):
+    """Figures for the Market Overview tab"""
+    level_dist = filtered_df['offering_level'].value_counts().loc[lambda counts: counts > 0]
+    fig_level = px.pie(
+        values=level_dist.values,
+        names=level_dist.index,
+        hole=0.4,
+        color_discrete_sequence=['#3b82f6', '#8b5cf6', '#ec4899', '#f59e0b', '#10b981']
+    )
+    fig_level.update_traces(
+        textposition='outside',
+        textinfo='label+percent',
+        textfont_size=13
+    )
+    fig_level.update_layout(
+        showlegend=False,
+        margin=dict(l=20, r=20, t=20, b=20),
+        height=320,
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(family='Inter', color='#374151')
+    )
+
+    cred_dist = filtered_df['credential_type'].value_counts().loc[lambda counts: counts > 0].head(6)
+    fig_cred = px.pie(
+        values=cred_dist.values,
+        names=cred_dist.index,
+        hole=0.4,
+        color_discrete_sequence=['#3b82f6', '#10b981', '#f59e0b', '#ec4899', '#8b5cf6', '#6366f1']
+    )
+    fig_cred.update_traces(
+        textposition='outside',
+        textinfo='label+percent',
+        textfont_size=13
+    )
+    fig_cred.update_layout(
+        showlegend=False,
+        margin=dict(l=20, r=20, t=20, b=20),
+        height=320,
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(family='Inter', color='#374151')
+    )
+
+    inst_counts = filtered_df['institution'].value_counts().loc[lambda counts: counts > 0].head(15).reset_index()
+    inst_counts.columns = ['Institution', 'Offerings']
+    fig_inst = px.bar(
+        inst_counts,
+        x='Offerings',
+        y='Institution',
+        orientation='h',
+        color='Offerings',
+        color_continuous_scale=[[0, '#dbeafe'], [1, '#3b82f6']]
+    )
+    fig_inst.update_layout(
+        showlegend=False,
+        xaxis_title="Number of Offerings",
+        yaxis_title="",
+        margin=dict(l=20, r=20, t=20, b=20),
+        height=450,
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(family='Inter', color='#374151'),
+        xaxis=dict(gridcolor='#f3f4f6'),
+        yaxis=dict(categoryorder='total ascending', gridcolor='#f3f4f6')
+    )
+
+    fig_scatter, scatter_note = price_duration_figure(filtered_df)
+
+    return {
+        'level': fig_level, 'credential': fig_cred, 'institutions': fig_inst,
+        'scatter': fig_scatter, 'scatter_note': scatter_note
+    }
+
+def skills_content(skill_table, rows):
+    """Top-skill chart and market-leader shares for the Skills Intelligence tab"""
+    # Count skills from the pre-parsed skill table
+    top_skills_data = skill_table.most_common(rows, top_n=20)
+    if not top_skills_data:
+        return None
+    skills_df = pd.DataFrame(top_skills_data, columns=['Skill', 'Count'])
+
+    fig_skills = px.bar(
+        skills_df.head(15),
+        x='Count',
+        y='Skill',
+        orientation='h',
+        color='Count',
+        color_continuous_scale=[[0, '#dbeafe'], [1, '#3b82f6']]
+    )
+    fig_skills.update_layout(
+        showlegend=False,
+        xaxis_title="Number of Programs",
+        yaxis_title="",
+        margin=dict(l=20, r=20, t=20, b=20),
+        height=520,
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font=dict(family='Inter', color='#374151'),
+        xaxis=dict(gridcolor='#f3f4f6'),
+        yaxis=dict(categoryorder='total ascending', gridcolor='#f3f4f6')
+    )
+
+    total_skill_mentions = skill_table.mention_count(rows)
+    top_5_skills = skills_df.head(5).copy()
+    top_5_skills['Percentage'] = (top_5_skills['Count'] / total_skill_mentions * 100).round(1)
+    return {'figure': fig_skills, 'leaders': top_5_skills}
+
+BOX_COLORS = ['#3b82f6', '#8b5cf6', '#ec4899', '#f59e0b', '#10b981']
+
+def price_box_figure(stats):
+    """Box plot drawn from precomputed statistics, with sampled outliers as markers"""
+    fig = go.Figure()
+    for i, box in enumerate(stats):
+        color = BOX_COLORS[i % len(BOX_COLORS)]
+        fig.add_trace(go.Box(
+            x=[box['label']],
+            q1=[box['q1']],
+            median=[box['median']],
+            q3=[box['q3']],
+            lowerfence=[box['lowerfence']],
+            upperfence=[box['upperfence']],
+            name=box['label'],
+            marker_color=color,
+            boxpoints=False
+        ))
+        if len(box['outliers']):
+            fig.add_trace(go.Scatter(
+                x=np.full(len(box['outliers']), box['label'], dtype=object),
+                y=box['outliers'],
+                mode='markers',
+                marker=dict(color=color, size=5),
+                name=box['label'],
+                hovertemplate='%{x}<br>Price: $%{y:,.0f}<extra></extra>'
+            ))
+    fig.update_layout(boxmode='overlay')
+    return fig
+
+def competitive_content(filter_engine, filtered_rows, filtered_df):
+    """Institution table and price box plot for the Competitive Analysis tab"""
+    institution_stats = filtered_df.groupby('institution', observed=True).agg({
+        'program_id': 'count',
+        'price_cad': 'mean',
+        'duration_weeks': 'mean'
+    }).round(0).reset_index()
+
+    institution_stats.columns = ['Institution', 'Offerings', 'Avg Price', 'Avg Duration']
+    institution_stats = institution_stats.sort_values('Offerings', ascending=False).head(10)
+    institution_stats['Avg Price'] = institution_stats['Avg Price'].apply(lambda x: f"${x:,.0f}" if pd.notna(x) else "N/A")
+    institution_stats['Avg Duration'] = institution_stats['Avg Duration'].apply(lambda x: f"{x:.0f}w" if pd.notna(x) else "N/A")
+
+    fig_box = None
+    box_note = None
+    box_stats = grouped_box_stats(filter_engine, filtered_rows, 'price_cad', 'offering_level')
+    if box_stats:
+        fig_box = price_box_figure(box_stats)
+        shown = sum(len(box['outliers']) for box in box_stats)
+        total = sum(box['outlier_count'] for box in box_stats)
+        if shown < total:
+            box_note = f"Showing a sample of {shown:,} of {total:,} outliers"
+        fig_box.update_layout(
+            showlegend=False,
+            xaxis_title="",
+            yaxis_title="Price (CAD)",
+            height=380,
+            paper_bgcolor='rgba(0,0,0,0)',
+            plot_bgcolor='rgba(0,0,0,0)',
+            font=dict(family='Inter', color='#374151'),
+            xaxis=dict(gridcolor='#f3f4f6'),
+            yaxis=dict(gridcolor='#f3f4f6')
+        )
+
+    return {'institutions': institution_stats, 'box': fig_box, 'box_note': box_note}
@@ -0,0 +1,1101 @@
+"""Data layer behind the dashboard: loading, indexes, filtering, aggregates and exports
+
+Nothing here imports Streamlit or Plotly, so scripts and services can reuse it without
+starting a UI. Writers for optional formats import their libraries when first used.
+"""
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import re
+import io
+import importlib.util
+import os
+import json
+import hashlib
+import pickle
+import sys
+import uuid
+import threading
+import time
+from datetime import datetime, timezone
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from functools import lru_cache
+from credscout_pipeline import (
+    PIPELINE_VERSION, OFFERING_LEVEL_CONFIG, assess_data_quality, apply_compact_schema, process_raw_bytes
+)
+
+# Timing spans kept for the diagnostics panel, shared by all sessions
+TIMING_BUFFER_SIZE = 2_000
+# Optional file every span is also appended to, as one JSON line
+TIMING_LOG_PATH = os.environ.get('CREDSCOUT_TIMING_LOG')
+
+def timing_log_line(started_at, stage, seconds):
+    """One timing span as a JSON log line"""
+    return json.dumps({
+        'time': datetime.fromtimestamp(started_at, timezone.utc).isoformat(timespec='milliseconds'),
+        'stage': stage,
+        'ms': round(seconds * 1000, 3),
+    })
+
+class StageTimings:
+    """Ring buffer of recent (start time, stage, seconds) spans with per-stage percentiles
+
+    Shared by all sessions, so appends and reads hold a lock.
+    """
+
+    def __init__(self, max_spans=TIMING_BUFFER_SIZE, log_path=TIMING_LOG_PATH):
+        self.spans = deque(maxlen=max_spans)
+        self.log_path = log_path
+        self.lock = threading.Lock()
+
+    def record(self, stage, seconds, started_at=None):
+        span = (time.time() - seconds if started_at is None else started_at, stage, seconds)
+        with self.lock:
+            self.spans.append(span)
+            if self.log_path:
+                try:
+                    with open(self.log_path, 'a') as log:
+                        log.write(timing_log_line(*span) + '\n')
+                except OSError:
+                    # The log is best effort and never fails a rerun
+                    pass
+
+    @contextmanager
+    def span(self, stage):
+        """Time the body of a with block as one span of stage"""
+        started_at = time.time()
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - started, started_at)
+
+    def summary(self):
+        """Span count and p50/p95/p99/last latency in ms per stage, slowest p95 first"""
+        with self.lock:
+            spans = list(self.spans)
+        columns = ['stage', 'count', 'p50_ms', 'p95_ms', 'p99_ms', 'last_ms']
+        if not spans:
+            return pd.DataFrame(columns=columns)
+        seconds = pd.DataFrame(spans, columns=['started_at', 'stage', 'seconds']).groupby('stage')['seconds']
+        milliseconds = seconds.quantile([0.5, 0.95, 0.99]).unstack() * 1000
+        summary = pd.DataFrame({
+            'count': seconds.size(),
+            'p50_ms': milliseconds[0.5],
+            'p95_ms': milliseconds[0.95],
+            'p99_ms': milliseconds[0.99],
+            'last_ms': seconds.last() * 1000,
+        })
+        return summary.sort_values('p95_ms', ascending=False).reset_index()[columns]
+
+    def log_lines(self):
+        """Buffered spans, oldest first, as newline-separated JSON"""
+        with self.lock:
+            spans = list(self.spans)
+        return ''.join(timing_log_line(*span) + '\n' for span in spans)
+
+# One timing buffer per process, shared by every session of a server
+STAGE_TIMINGS = StageTimings()
+
+def timed(stage):
+    """Context manager recording the time spent in a stage of the rerun"""
+    return STAGE_TIMINGS.span(stage)
+
+def estimate_unique_programs(df):
+    """Calculate Lightcast-style estimates"""
+    return estimate_unique_from_counts(len(df), int((df['offering_level'] == 'course').sum()))
+
+def estimate_unique_from_counts(total, course_count):
+    """Lightcast-style estimates from offering and course counts"""
+    # Assume 4 courses ≈ 1 certificate
+    estimated_programs_from_courses = course_count / 4
+    non_course_count = total - course_count
+    estimated_unique = int(non_course_count + estimated_programs_from_courses)
+    
+    return {
+        'total': total,
+        'estimated_unique': estimated_unique,
+        'course_count': course_count
+    }
+
+PROCESSED_CACHE_DIR = os.environ.get(
+    'CREDSCOUT_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'credscout')
+)
+PROCESSED_CACHE_MAX_ENTRIES = 20
+
+def processed_cache_key(uploaded_file):
+    """Hash the upload's bytes together with the pipeline version and offering-level rules"""
+    hasher = hashlib.blake2b(digest_size=20)
+    hasher.update(json.dumps([PIPELINE_VERSION, OFFERING_LEVEL_CONFIG]).encode('utf-8'))
+    uploaded_file.seek(0)
+    while True:
+        chunk = uploaded_file.read(1 << 20)
+        if not chunk:
+            break
+        hasher.update(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+    uploaded_file.seek(0)
+    return hasher.hexdigest()
+
+def processed_cache_paths(key):
+    """Arrow IPC file holding a processed frame, and Parquet file holding its quality profile"""
+    return (
+        os.path.join(PROCESSED_CACHE_DIR, f"{key}.arrow"),
+        os.path.join(PROCESSED_CACHE_DIR, f"{key}.quality.parquet"),
+    )
+
+def read_mapped_frame(path):
+    """DataFrame over a memory-mapped Arrow IPC file
+
+    The file is mapped read-only and text columns stay on its pages, so every process and
+    session reading the same entry shares one copy through the OS page cache. Only
+    categorical codes, dates and numbers with missing values are copied out.
+    """
+    with pa.memory_map(path) as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas()
+
+def write_arrow_frame(df, path):
+    """Write a frame as an uncompressed Arrow IPC file, which can be memory-mapped"""
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.OSFile(path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+        writer.write_table(table)
+
+def read_processed_cache(key):
+    """Return the cached (df, quality_profile) for a key, or None on a miss"""
+    data_path, profile_path = processed_cache_paths(key)
+    if not (os.path.exists(data_path) and os.path.exists(profile_path)):
+        return None
+    try:
+        return read_mapped_frame(data_path), pd.read_parquet(profile_path)
+    except Exception:
+        # Unreadable or partial entries are treated as a miss and rebuilt
+        return None
+
+def write_processed_cache(key, df, quality_profile):
+    """Persist a processed frame; the cache is best effort and never fails a load"""
+    data_path, profile_path = processed_cache_paths(key)
+    try:
+        os.makedirs(PROCESSED_CACHE_DIR, exist_ok=True)
+        # Write to temp files first so readers never see half-written entries; replacing a
+        # file leaves frames already mapped from it intact
+        writes = [(quality_profile, profile_path, pd.DataFrame.to_parquet), (df, data_path, write_arrow_frame)]
+        for frame, path, write in writes:
+            tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            write(frame, tmp_path)
+            os.replace(tmp_path, path)
+        prune_processed_cache()
+    except Exception:
+        pass
+
+def prune_processed_cache(max_entries=PROCESSED_CACHE_MAX_ENTRIES):
+    """Drop the least recently written entries beyond max_entries"""
+    entries = sorted(
+        (entry for entry in os.scandir(PROCESSED_CACHE_DIR) if entry.name.endswith('.quality.parquet')),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True
+    )
+    stale_keys = {entry.name[:-len('.quality.parquet')] for entry in entries[max_entries:]}
+    # Every file of a stale key goes, including data files of older cache formats
+    for entry in os.scandir(PROCESSED_CACHE_DIR):
+        if entry.name.split('.', 1)[0] in stale_keys:
+            os.remove(entry.path)
+
+def load_processed(uploaded_file, key=None):
+    """Processed frame and data-quality profile of an upload, reusing the on-disk cache
+
+    key is the upload's processed_cache_key, when the caller already has it. A freshly
+    processed frame is read back from its new cache entry, so it is memory-mapped too.
+    """
+    key = key or processed_cache_key(uploaded_file)
+    cached = read_processed_cache(key)
+    if cached is not None:
+        return cached
+
+    df, quality_profile = process_upload(uploaded_file)
+    write_processed_cache(key, df, quality_profile)
+    return read_processed_cache(key) or (df, quality_profile)
+
+def process_upload(uploaded_file):
+    """Load and process CSV data - handles headerless raw data or preprocessed data"""
+    
+    # Try reading first - see if it has headers
+    try:
+        test_df = pd.read_csv(uploaded_file, nrows=1)
+        # Check if first row looks like data or headers
+        preprocessed = 'program_id' in test_df.columns or 'offering_level' in test_df.columns
+    except ValueError:
+        # Empty, undecodable or ragged first lines are left to the raw parser
+        preprocessed = False
+    uploaded_file.seek(0)  # Reset file pointer
+
+    if preprocessed:
+        # Preprocessed data with headers
+        df = pd.read_csv(uploaded_file)
+        df['date_added'] = pd.to_datetime(df['date_added'], errors='coerce')
+        quality_profile = assess_data_quality(df)[1]
+        return apply_compact_schema(df), quality_profile
+    
+    # Assume headerless raw format; large uploads are cleaned across a process pool
+    df, quality_profile = process_raw_bytes(uploaded_file.read())
+    return apply_compact_schema(df), quality_profile
+
+SEARCH_FIELDS = ['title', 'institution', 'skills', 'description']
+# Word characters for index terms; queries are split with the same pattern
+SEARCH_SEPARATOR_PATTERN = r'[^\p{L}\p{N}_]+'
+# Shorter query words hit too much of the vocabulary to narrow anything down
+MIN_INDEXED_TOKEN_LENGTH = 3
+SEARCH_TOKEN_CACHE_SIZE = 256
+
+def to_arrow_strings(values):
+    """Contiguous Arrow large_string array for a column of strings"""
+    array = pa.array(values, type=pa.large_string())
+    return array.combine_chunks() if isinstance(array, pa.ChunkedArray) else array
+
+def split_search_tokens(texts):
+    """Split an Arrow string array into word tokens, returning (tokens, parent row)"""
+    pieces = pc.split_pattern_regex(texts, pattern=SEARCH_SEPARATOR_PATTERN)
+    tokens = pc.list_flatten(pieces)
+    parents = pc.list_parent_indices(pieces)
+    non_empty = pc.not_equal(tokens, '')
+    return tokens.filter(non_empty), parents.filter(non_empty)
+
+@lru_cache(maxsize=SEARCH_TOKEN_CACHE_SIZE)
+def query_tokens(query):
+    """Word tokens of a lowercased query, split exactly like the indexed text"""
+    return split_search_tokens(to_arrow_strings([query]))[0].to_pylist()
+
+def lowered_search_field(df, field):
+    """Lowercased text of one search field, with missing values as empty strings"""
+    column = df[field] if field in df else pd.Series('', index=df.index)
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        column = column.astype(object)
+    return column.where(column.notna(), '').astype(str).str.lower().reset_index(drop=True)
+
+def tokenize_search_fields(texts):
+    """Word tokens of several fields as (vocabulary, term code per token, row per token)"""
+    terms, rows = [], []
+    for lowered in texts.values():
+        tokens, parents = split_search_tokens(to_arrow_strings(lowered))
+        terms.append(tokens)
+        rows.append(parents.to_numpy().astype(np.int64))
+    encoded = pa.chunked_array(terms, type=pa.large_string()).combine_chunks().dictionary_encode()
+    term_codes = encoded.indices.to_numpy(zero_copy_only=False).astype(np.int64)
+    return encoded.dictionary, term_codes, np.concatenate(rows)
+
+class SearchIndex:
+    """Inverted index over the search fields for case-insensitive substring queries
+
+    Terms are the lowercased word tokens of each field, with posting lists of row
+    positions stored CSR-style (indptr/indices). A query word matches every term that
+    contains it, so indexed results are the same as a literal substring scan.
+    """
+
+    def __init__(self, df, fields=SEARCH_FIELDS):
+        self.size = len(df)
+        self.texts = {field: lowered_search_field(df, field) for field in fields}
+        vocabulary, term_codes, rows = tokenize_search_fields(self.texts)
+        self.set_postings(vocabulary, term_codes, rows)
+
+    def set_postings(self, vocabulary, term_codes, rows):
+        """Store (term, row) pairs as sorted, deduplicated CSR posting lists"""
+        stride = max(self.size, 1)
+        pairs = np.sort(term_codes * stride + rows)
+        # No tokens at all (an empty frame or blank text) leaves empty posting lists
+        if len(pairs):
+            pairs = pairs[np.concatenate([[True], pairs[1:] != pairs[:-1]])]
+        pair_terms, pair_rows = np.divmod(pairs, stride)
+        self.vocabulary_array = vocabulary
+        self.vocabulary = vocabulary.to_pylist()
+        self.indptr = np.searchsorted(pair_terms, np.arange(len(self.vocabulary) + 1))
+        self.indices = pair_rows
+
+        # All terms in one newline-separated string so term lookups run as C-level str.find
+        self.vocabulary_text = '\n'.join(self.vocabulary) + '\n'
+        term_lengths = np.array([len(term) + 1 for term in self.vocabulary], dtype=np.int64)
+        self.term_starts = np.concatenate([[0], np.cumsum(term_lengths)[:-1]]).astype(np.int64)
+        self.token_cache = {}
+
+    def updated(self, df, changed_rows):
+        """Index for df, re-tokenizing only changed_rows and the rows appended after this index
+
+        Rows of df before self.size that are not in changed_rows must be unchanged.
+        """
+        index = SearchIndex.__new__(SearchIndex)
+        index.size = len(df)
+        delta_rows = np.concatenate([np.asarray(changed_rows, dtype=np.int64), np.arange(self.size, len(df))])
+        delta = df.iloc[delta_rows]
+        index.texts = {}
+        for field, texts in self.texts.items():
+            texts = texts.reindex(range(len(df)))
+            texts.iloc[delta_rows] = lowered_search_field(delta, field).to_numpy()
+            index.texts[field] = texts
+
+        # Postings of untouched rows carry over; new terms extend the vocabulary
+        stale = np.zeros(len(df), dtype=bool)
+        stale[delta_rows] = True
+        old_terms = np.repeat(np.arange(len(self.vocabulary), dtype=np.int64), np.diff(self.indptr))
+        keep = ~stale[self.indices]
+        delta_vocabulary, delta_codes, rows = tokenize_search_fields(
+            {field: texts.iloc[delta_rows] for field, texts in index.texts.items()}
+        )
+        # A delta without new terms has no nulls, and Arrow hands those back as a read-only view
+        known = np.array(pc.index_in(delta_vocabulary, value_set=self.vocabulary_array), dtype=np.float64)
+        added = np.isnan(known)
+        known[added] = len(self.vocabulary) + np.arange(added.sum())
+        vocabulary = pa.concat_arrays([self.vocabulary_array, delta_vocabulary.filter(pa.array(added))])
+        index.set_postings(
+            vocabulary,
+            np.concatenate([old_terms[keep], known.astype(np.int64)[delta_codes]]),
+            np.concatenate([self.indices[keep], delta_rows[rows]]),
+        )
+        return index
+
+    def token_rows(self, token):
+        """Sorted row positions with a term containing token"""
+        if token in self.token_cache:
+            return self.token_cache[token]
+
+        positions = []
+        position = self.vocabulary_text.find(token)
+        while position != -1:
+            positions.append(position)
+            next_term = self.vocabulary_text.find('\n', position) + 1
+            position = self.vocabulary_text.find(token, next_term)
+        term_ids = np.searchsorted(self.term_starts, positions, side='right') - 1
+
+        if len(term_ids) == 1:
+            rows = self.indices[self.indptr[term_ids[0]]:self.indptr[term_ids[0] + 1]]
+        else:
+            # Union of the matching posting lists through a row bitmap
+            hit = np.zeros(self.size, dtype=bool)
+            for term_id in term_ids:
+                hit[self.indices[self.indptr[term_id]:self.indptr[term_id + 1]]] = True
+            rows = np.flatnonzero(hit)
+
+        if len(self.token_cache) >= SEARCH_TOKEN_CACHE_SIZE:
+            self.token_cache.clear()
+        self.token_cache[token] = rows
+        return rows
+
+    def scan(self, query, rows=None, regex=False):
+        """Substring (or regex) scan of the lowercased fields, optionally limited to rows"""
+        rows = np.arange(self.size) if rows is None else rows
+        hit = np.zeros(len(rows), dtype=bool)
+        for texts in self.texts.values():
+            hit |= texts.iloc[rows].str.contains(query, regex=regex).to_numpy(dtype=bool, na_value=False)
+        return rows[hit]
+
+    def search(self, query, regex=False):
+        """Row positions whose title, institution, skills or description contain query"""
+        query = query.lower()
+        if regex:
+            try:
+                re.compile(query)
+                return self.scan(query, regex=True)
+            except re.error:
+                pass
+
+        tokens = query_tokens(query)
+        indexed = [token for token in tokens if len(token) >= MIN_INDEXED_TOKEN_LENGTH]
+        if not indexed:
+            return self.scan(query)
+
+        # Intersect posting lists, smallest first
+        candidates = None
+        for rows in sorted((self.token_rows(token) for token in indexed), key=len):
+            if candidates is None:
+                candidates = rows
+            else:
+                keep = np.zeros(self.size, dtype=bool)
+                keep[rows] = True
+                candidates = candidates[keep[candidates]]
+
+        # A query that is one whole word can only occur inside a single term
+        if tokens == [query]:
+            return candidates
+        return self.scan(query, rows=candidates)
+
+# Programs offered per lookup query
+LOOKUP_MAX_MATCHES = 20
+# Bits per code point in a packed trigram; Unicode needs 21
+TRIGRAM_CODEPOINT_BITS = 21
+
+def title_trigrams(titles):
+    """Character trigrams of each title as (sorted trigram keys, indptr, title codes)
+
+    A trigram packs three code points into one uint64; trigram i is contained in the
+    titles title_codes[indptr[i]:indptr[i + 1]], listed in ascending order.
+    """
+    lengths = np.fromiter(map(len, titles), dtype=np.int64, count=len(titles))
+    codepoints = np.frombuffer(''.join(titles).encode('utf-32-le'), dtype=np.uint32).astype(np.uint64)
+    owners = np.repeat(np.arange(len(titles), dtype=np.int32), lengths)
+    ends = np.cumsum(lengths)
+    starts = np.arange(max(len(codepoints) - 2, 0))
+    starts = starts[starts + 2 < ends[owners[starts]]]
+    keys = (
+        (codepoints[starts] << np.uint64(2 * TRIGRAM_CODEPOINT_BITS))
+        | (codepoints[starts + 1] << np.uint64(TRIGRAM_CODEPOINT_BITS))
+        | codepoints[starts + 2]
+    )
+    # A stable sort keeps each trigram's titles ascending, so repeats are adjacent
+    order = np.argsort(keys, kind='stable')
+    keys = keys[order]
+    title_codes = owners[starts[order]]
+    first = np.ones(len(keys), dtype=bool)
+    first[1:] = (keys[1:] != keys[:-1]) | (title_codes[1:] != title_codes[:-1])
+    keys = keys[first]
+    title_codes = title_codes[first]
+    trigrams, indptr = np.unique(keys, return_index=True)
+    return trigrams, np.append(indptr, len(keys)), title_codes
+
+def query_trigrams(query):
+    """Packed trigram keys of a query string, as title_trigrams builds them"""
+    codepoints = [ord(character) for character in query]
+    return [
+        (a << 2 * TRIGRAM_CODEPOINT_BITS) | (b << TRIGRAM_CODEPOINT_BITS) | c
+        for a, b, c in zip(codepoints, codepoints[1:], codepoints[2:])
+    ]
+
+class ProgramLookup:
+    """Typeahead index of program titles, plus a program_id -> row position index
+
+    Distinct lowercased titles are kept sorted, so prefix matches are one binary search.
+    Substring matches only check titles that hold every trigram of the query. Matches
+    come back as program_ids, which map to row positions through a dense array.
+    """
+
+    def __init__(self, df):
+        codes, titles = pd.factorize(lowered_search_field(df, 'title'), sort=True)
+        self.titles = np.asarray(titles, dtype=object)
+        self.row_titles = codes
+        order = np.argsort(codes, kind='stable')
+        self.title_rows = order
+        self.title_indptr = np.searchsorted(codes[order], np.arange(len(self.titles) + 1))
+        self.trigrams, self.trigram_indptr, self.trigram_titles = title_trigrams(self.titles)
+
+        self.program_ids = df['program_id'].to_numpy(dtype=np.int64)
+        max_id = self.program_ids.max() if len(self.program_ids) else -1
+        self.id_rows = np.full(max_id + 1, -1, dtype=np.int64)
+        self.id_rows[self.program_ids] = np.arange(len(self.program_ids))
+
+    def row(self, program_id):
+        """Row position of a program_id, or None if it is not in the dataset"""
+        if not 0 <= program_id < len(self.id_rows) or self.id_rows[program_id] < 0:
+            return None
+        return int(self.id_rows[program_id])
+
+    def substring_titles(self, query):
+        """Title codes, ascending, whose trigrams include all of the query's"""
+        candidates = None
+        for key in set(query_trigrams(query)):
+            position = np.searchsorted(self.trigrams, key)
+            if position == len(self.trigrams) or self.trigrams[position] != key:
+                return np.array([], dtype=np.int32)
+            titles = self.trigram_titles[self.trigram_indptr[position]:self.trigram_indptr[position + 1]]
+            candidates = titles if candidates is None else np.intersect1d(candidates, titles, assume_unique=True)
+        return candidates
+
+    def matches(self, query, limit=LOOKUP_MAX_MATCHES, rows=None):
+        """program_ids of up to limit programs whose title contains query, prefix matches first
+
+        rows limits matches to those row positions, e.g. the current filter selection;
+        it is applied before the limit, so excluded programs never take a slot.
+        """
+        query = query.strip().lower()
+        if not query:
+            return np.array([], dtype=np.int64)
+        allowed = None
+        if rows is not None:
+            allowed = np.zeros(len(self.program_ids), dtype=bool)
+            allowed[rows] = True
+
+        # Title rows are grouped by title code, so all prefix matches are one slice
+        first = np.searchsorted(self.titles, query)
+        last = np.searchsorted(self.titles, query + '\U0010ffff')
+        matched = self.title_rows[self.title_indptr[first]:self.title_indptr[last]]
+        if allowed is not None:
+            matched = matched[allowed[matched]]
+        matched = [matched[:limit]]
+        found = len(matched[0])
+        if found < limit and len(query) >= 3:
+            codes = self.substring_titles(query)
+            codes = codes[(codes < first) | (codes >= last)]
+            if allowed is not None:
+                allowed_titles = np.zeros(len(self.titles), dtype=bool)
+                allowed_titles[self.row_titles[allowed]] = True
+                codes = codes[allowed_titles[codes]]
+            for code in codes:
+                if found >= limit:
+                    break
+                if query in self.titles[code]:
+                    code_rows = self.title_rows[self.title_indptr[code]:self.title_indptr[code + 1]]
+                    if allowed is not None:
+                        code_rows = code_rows[allowed[code_rows]]
+                    matched.append(code_rows)
+                    found += len(code_rows)
+        return self.program_ids[np.concatenate(matched)[:limit]]
+
+class SkillTable:
+    """Skills parsed once into interned integer IDs, stored CSR-style per row
+
+    Row i's skills are skill_ids[indptr[i]:indptr[i + 1]], in the order they were listed.
+    """
+
+    def __init__(self, skills):
+        self.size = len(skills)
+        present = (skills.notna() & (skills != 'Unknown')).to_numpy(dtype=bool)
+        texts = to_arrow_strings(skills[present].astype(str))
+        pieces = pc.split_pattern(texts, pattern=',')
+        rows = np.flatnonzero(present)[pc.list_parent_indices(pieces).to_numpy()]
+
+        # Strip each distinct piece once, then merge pieces that strip to the same skill
+        encoded = pc.list_flatten(pieces).dictionary_encode()
+        stripped = np.array([piece.strip() for piece in encoded.dictionary.to_pylist()], dtype=object)
+        piece_skill_ids, vocabulary = pd.factorize(stripped)
+        self.vocabulary = list(vocabulary)
+        self.skill_ids = piece_skill_ids[encoded.indices.to_numpy()].astype(np.int32)
+        self.indptr = np.searchsorted(rows, np.arange(self.size + 1))
+
+    def updated(self, skills, changed_rows):
+        """Table for skills, re-parsing only changed_rows and the rows appended after this table
+
+        Rows before self.size that are not in changed_rows must be unchanged.
+        """
+        delta_rows = np.concatenate([np.asarray(changed_rows, dtype=np.int64), np.arange(self.size, len(skills))])
+        delta = SkillTable(skills.iloc[delta_rows])
+        table = SkillTable.__new__(SkillTable)
+        table.size = len(skills)
+
+        # Skills first seen in the delta extend the vocabulary
+        skill_lookup = {skill: skill_id for skill_id, skill in enumerate(self.vocabulary)}
+        table.vocabulary = list(self.vocabulary)
+        delta_to_table = np.empty(len(delta.vocabulary), dtype=np.int32)
+        for delta_id, skill in enumerate(delta.vocabulary):
+            if skill not in skill_lookup:
+                skill_lookup[skill] = len(table.vocabulary)
+                table.vocabulary.append(skill)
+            delta_to_table[delta_id] = skill_lookup[skill]
+
+        # Each row's skills come from either the old table or the delta, in row order
+        sources = np.concatenate([self.skill_ids, delta_to_table[delta.skill_ids]])
+        starts = np.append(self.indptr[:-1], np.zeros(table.size - self.size, dtype=np.int64))
+        lengths = np.append(np.diff(self.indptr), np.zeros(table.size - self.size, dtype=np.int64))
+        starts[delta_rows] = len(self.skill_ids) + delta.indptr[:-1]
+        lengths[delta_rows] = np.diff(delta.indptr)
+        table.indptr = np.concatenate([[0], np.cumsum(lengths)])
+        offsets = np.repeat(starts - table.indptr[:-1], lengths) + np.arange(table.indptr[-1])
+        table.skill_ids = sources[offsets]
+        return table
+
+    def gather(self, rows=None):
+        """Skill IDs of the given row positions (all rows by default), in row order"""
+        if rows is None:
+            return self.skill_ids
+        rows = np.asarray(rows)
+        starts = self.indptr[rows]
+        lengths = self.indptr[rows + 1] - starts
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+        return self.skill_ids[offsets]
+
+    def most_common(self, rows=None, top_n=None):
+        """(skill, count) pairs for the given rows, ordered like Counter.most_common"""
+        ids = self.gather(rows)
+        counts = np.bincount(ids, minlength=len(self.vocabulary))
+        # Ties keep first-seen order, as Counter does
+        first_seen = np.full(len(self.vocabulary), len(ids))
+        np.minimum.at(first_seen, ids, np.arange(len(ids)))
+        seen = np.flatnonzero(counts)
+        order = seen[np.lexsort((first_seen[seen], -counts[seen]))]
+        if top_n is not None:
+            order = order[:top_n]
+        return [(self.vocabulary[skill_id], int(counts[skill_id])) for skill_id in order]
+
+    def mention_count(self, rows=None):
+        """Total skill mentions across the given rows"""
+        if rows is None:
+            return len(self.skill_ids)
+        rows = np.asarray(rows)
+        return int((self.indptr[rows + 1] - self.indptr[rows]).sum())
+
+    def row_skills(self, row):
+        """Skills listed on one row"""
+        return [self.vocabulary[skill_id] for skill_id in self.skill_ids[self.indptr[row]:self.indptr[row + 1]]]
+
+def extract_top_skills(skill_table, rows=None, top_n=50):
+    """Extract top skills from the dataset"""
+    return [skill for skill, count in skill_table.most_common(rows, top_n)]
+
+# Columns filtered by exact value, and numeric columns filtered by range
+FILTER_COLUMNS = ['offering_level', 'credential_type', 'institution', 'delivery_mode', 'data_quality']
+RANGE_FILTER_COLUMNS = ['price_cad', 'duration_weeks']
+
+class FilterEngine:
+    """Category codes and numeric arrays for resolving all filters to one row selection"""
+
+    def __init__(self, df):
+        self.size = len(df)
+        self.codes = {}
+        self.value_codes = {}
+        for column in FILTER_COLUMNS:
+            codes, values = pd.factorize(df[column])
+            self.codes[column] = codes.astype(np.int32)
+            self.value_codes[column] = {value: code for code, value in enumerate(values)}
+        self.numbers = {
+            column: df[column].to_numpy(dtype='float64', na_value=np.nan)
+            for column in RANGE_FILTER_COLUMNS
+        }
+        self.sketches = {column: QuantileSketch(values) for column, values in self.numbers.items()}
+
+    def options(self, column):
+        """Sorted distinct values of a filter column"""
+        return sorted(self.value_codes[column])
+
+    def bounds(self, column):
+        """(min, max) of a numeric filter column, or None when it has no values"""
+        values = self.numbers[column]
+        present = values[~np.isnan(values)]
+        if len(present) == 0:
+            return None
+        return present.min(), present.max()
+
+    def select(self, equals=None, ranges=None, rows=None):
+        """Row positions matching every value filter and range, within rows if given
+
+        Missing values pass range filters, as they always have in the dashboard.
+        """
+        rows = np.arange(self.size) if rows is None else np.asarray(rows)
+        keep = np.ones(len(rows), dtype=bool)
+        for column, value in (equals or {}).items():
+            code = self.value_codes[column].get(value, -2)
+            keep &= self.codes[column][rows] == code
+        for column, (low, high) in (ranges or {}).items():
+            values = self.numbers[column][rows]
+            keep &= np.isnan(values) | ((values >= low) & (values <= high))
+        return rows[keep]
+
+    def quantiles(self, column, rows, qs, groups=None, group_count=1):
+        """(group_count, len(qs)) quantiles of a numeric column over rows, NaN for empty groups
+
+        Small selections get exact linear-interpolated quantiles; past
+        EXACT_QUANTILE_MAX_VALUES the column's sketch answers instead.
+        """
+        groups = np.zeros(len(rows), dtype=np.int32) if groups is None else groups
+        values = self.numbers[column][rows]
+        present = ~np.isnan(values) & (groups >= 0)
+        if present.sum() <= EXACT_QUANTILE_MAX_VALUES:
+            return grouped_quantiles(values[present], groups[present], group_count, qs)
+        sketch = self.sketches[column]
+        return sketch.quantiles(sketch.counts(rows, groups, group_count), qs)
+
+# Relative error of quantiles read from a sketch, and the selection size where sketches
+# take over from exact quantiles
+SKETCH_RELATIVE_ACCURACY = 0.01
+EXACT_QUANTILE_MAX_VALUES = 100_000
+
+class QuantileSketch:
+    """Mergeable quantile sketch over one numeric column, with bounded relative error
+
+    Each value is assigned once to a logarithmic bucket (zero and below share the first
+    bucket), so the sketch of any row set is a bucket count vector. Counts of disjoint
+    row sets, chunks or groups simply add up, and a quantile is read off the cumulative
+    counts in O(buckets), within SKETCH_RELATIVE_ACCURACY of an actual value.
+    """
+
+    def __init__(self, values, relative_accuracy=SKETCH_RELATIVE_ACCURACY):
+        gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        positive = values > 0
+        keys = np.ceil(np.log(values[positive]) / np.log(gamma)).astype(np.int64)
+        first_key = keys.min() if len(keys) else 0
+        self.buckets = np.full(len(values), -1, dtype=np.int32)
+        self.buckets[values <= 0] = 0
+        self.buckets[positive] = keys - first_key + 1
+        # A column with no values still gets the zero bucket, so its quantiles come out NaN
+        bucket_keys = np.arange(first_key, first_key + self.buckets.max(initial=0) + 1) - 1
+        # Each bucket reports the point of least relative error within (gamma^(k-1), gamma^k]
+        self.bucket_values = 2 * gamma ** bucket_keys / (gamma + 1)
+        self.bucket_values[0] = 0
+
+    def counts(self, rows=None, groups=None, group_count=1):
+        """(group_count, buckets) value counts over rows; rows without a value or group are skipped"""
+        buckets = self.buckets if rows is None else self.buckets[rows]
+        groups = np.zeros(len(buckets), dtype=np.int64) if groups is None else groups.astype(np.int64)
+        present = (buckets >= 0) & (groups >= 0)
+        bucket_count = len(self.bucket_values)
+        cells = groups[present] * bucket_count + buckets[present]
+        return np.bincount(cells, minlength=group_count * bucket_count).reshape(group_count, bucket_count)
+
+    def quantiles(self, counts, qs):
+        """(groups, len(qs)) quantiles from bucket counts, NaN for empty groups"""
+        cumulative = np.cumsum(counts, axis=1)
+        totals = cumulative[:, -1]
+        result = np.full((len(counts), len(qs)), np.nan)
+        for group in np.flatnonzero(totals):
+            ranks = np.asarray(qs) * (totals[group] - 1)
+            result[group] = self.bucket_values[np.searchsorted(cumulative[group], ranks, side='right')]
+        return result
+
+def grouped_quantiles(values, groups, group_count, qs):
+    """Exact (group_count, len(qs)) quantiles of values per group code, from one sort
+
+    Uses linear interpolation between order statistics, like np.percentile and plotly.
+    """
+    order = np.lexsort((values, groups))
+    values = values[order]
+    starts = np.searchsorted(groups[order], np.arange(group_count + 1))
+    sizes = np.diff(starts)
+    result = np.full((group_count, len(qs)), np.nan)
+    filled = sizes > 0
+    positions = starts[:-1, None] + np.asarray(qs)[None, :] * (sizes[:, None] - 1)
+    positions = positions[filled]
+    below = np.floor(positions).astype(np.int64)
+    above = np.ceil(positions).astype(np.int64)
+    result[filled] = values[below] + (values[above] - values[below]) * (positions - below)
+    return result
+
+SELECTION_CACHE_MAX_BYTES = 128 * 2**20
+# Rough per-entry cost of the aggregates dict, on top of the row array
+SELECTION_ENTRY_OVERHEAD_BYTES = 1024
+
+def estimated_bytes(value):
+    """Rough memory held by cached content: array and frame buffers, containers summed, other objects by pickled size"""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(deep=True))
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimated_bytes(item) for item in value.values())
+    if isinstance(value, (list, tuple)):
+        return sys.getsizeof(value) + sum(estimated_bytes(item) for item in value)
+    if value is None or isinstance(value, (str, bytes, int, float, np.generic)):
+        return sys.getsizeof(value)
+    # Plotly figures and anything else without a cheaper measure
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+class SelectionCache:
+    """LRU cache of filter results (row selection plus aggregates), bounded by memory size
+
+    Tab content and sort orders are attached to entries later and counted in their size.
+    Shared by all sessions, so access is serialized with a lock.
+    """
+
+    def __init__(self, max_bytes=SELECTION_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.size_bytes = 0
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+            return entry
+
+    def put(self, key, entry):
+        entry_bytes = entry['rows'].nbytes + SELECTION_ENTRY_OVERHEAD_BYTES
+        if entry_bytes > self.max_bytes:
+            return
+        with self.lock:
+            if key in self.entries:
+                self.size_bytes -= self.entries.pop(key)['bytes']
+            entry['bytes'] = entry_bytes
+            entry['parts'] = {}
+            self.entries[key] = entry
+            self.size_bytes += entry_bytes
+            while self.size_bytes > self.max_bytes:
+                self.size_bytes -= self.entries.popitem(last=False)[1]['bytes']
+
+    def part(self, key, name, default=None):
+        """Content attached to an entry under name, or default"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return default
+            return entry['parts'].get(name, (default, 0))[0]
+
+    def attach(self, key, name, content):
+        """Keep content with an entry, counting its estimated size and evicting to fit"""
+        content_bytes = estimated_bytes(content)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                return
+            parts = entry['parts']
+            added = content_bytes - (parts[name][1] if name in parts else 0)
+            parts[name] = (content, content_bytes)
+            entry['bytes'] += added
+            self.size_bytes += added
+            self.entries.move_to_end(key)
+            while self.size_bytes > self.max_bytes:
+                self.size_bytes -= self.entries.popitem(last=False)[1]['bytes']
+
+# Filter state with no search, selects or range limits
+ALL_ROWS_STATE = ('', (), (-np.inf, np.inf), (-np.inf, np.inf))
+
+def normalize_filter_state(search_term, selected_values, price_range, duration_range):
+    """Hashable cache key for a filter combination; search is case-insensitive"""
+    return (
+        search_term.lower() if search_term else '',
+        tuple(sorted(selected_values.items())),
+        tuple(price_range),
+        tuple(duration_range),
+    )
+
+def selection_aggregates(filter_engine, rows):
+    """Headline numbers for a row selection, computed from the filter engine's arrays"""
+    course_code = filter_engine.value_codes['offering_level'].get('course', -2)
+    course_count = int((filter_engine.codes['offering_level'][rows] == course_code).sum())
+    institution_codes = filter_engine.codes['institution'][rows]
+    prices = filter_engine.numbers['price_cad'][rows]
+    return {
+        **estimate_unique_from_counts(len(rows), course_count),
+        'institutions': len(np.unique(institution_codes[institution_codes >= 0])),
+        'avg_price': np.nanmean(prices) if (~np.isnan(prices)).any() else np.nan,
+        'median_price': filter_engine.quantiles('price_cad', rows, [0.5])[0, 0],
+    }
+
+def ranked_counts(filter_engine, column, rows, top_n=None):
+    """(value, count) pairs of a filter column over rows, most common first"""
+    codes = filter_engine.codes[column][rows]
+    values = list(filter_engine.value_codes[column])
+    counts = np.bincount(codes[codes >= 0], minlength=len(values))
+    order = np.argsort(-counts, kind='stable')
+    order = order[counts[order] > 0][:top_n]
+    return [(values[code], int(counts[code])) for code in order]
+
+def numeric_summary(filter_engine, column, rows):
+    """Count, mean and five-number summary of a numeric filter column over rows"""
+    values = filter_engine.numbers[column][rows]
+    present = values[~np.isnan(values)]
+    if len(present) == 0:
+        return {'count': 0}
+    q1, median, q3 = filter_engine.quantiles(column, rows, [0.25, 0.5, 0.75])[0]
+    return {
+        'count': len(present), 'mean': float(present.mean()), 'min': float(present.min()),
+        'q1': float(q1), 'median': float(median), 'q3': float(q3), 'max': float(present.max()),
+    }
+
+def select_filtered(filter_engine, search_index, selection_cache, filter_state):
+    """Row selection and aggregates for a normalized filter state, reusing cached results"""
+    entry = selection_cache.get(filter_state)
+    if entry is None:
+        search_term, selected_values, price_range, duration_range = filter_state
+        with timed('search' if search_term else 'filter'):
+            rows = filter_engine.select(
+                equals=dict(selected_values),
+                ranges={'price_cad': price_range, 'duration_weeks': duration_range},
+                rows=search_index.search(search_term) if search_term else None
+            )
+            rows = rows.astype(np.int32) if filter_engine.size < 2**31 else rows
+        with timed('aggregates'):
+            entry = {'rows': rows, 'aggregates': selection_aggregates(filter_engine, rows)}
+        selection_cache.put(filter_state, entry)
+    return entry['rows'], entry['aggregates']
+
+def cached_tab_content(selection_cache, filter_state, tab, compute):
+    """Content of one tab for a filter state, computed on first view and kept with its selection"""
+    missing = object()
+    content = selection_cache.part(filter_state, tab, missing)
+    if content is not missing:
+        return content
+    with timed(f'{tab}_content'):
+        content = compute()
+    selection_cache.attach(filter_state, tab, content)
+    return content
+
+# Program Explorer columns, in display order
+EXPLORER_COLUMNS = [
+    'title', 'institution', 'credential_type', 'offering_level', 'delivery_mode',
+    'duration_weeks', 'price_cad', 'data_quality'
+]
+
+class SortIndex:
+    """Row orders of the full dataset per column, for sorting any selection in linear time
+
+    Each (column, direction) order is computed on first use. Sorting a selection keeps
+    the dataset order's entries that are in the selection, so no per-selection sort runs.
+    """
+
+    def __init__(self, df):
+        self.df = df
+        self.orders = {}
+
+    def order(self, column, descending=False):
+        """All row positions ordered by column, missing values last"""
+        key = (column, descending)
+        if key not in self.orders:
+            values = self.df[column].reset_index(drop=True)
+            order = values.sort_values(ascending=not descending, na_position='last', kind='stable').index.to_numpy()
+            self.orders[key] = order.astype(np.int32) if len(order) < 2**31 else order
+        return self.orders[key]
+
+    def sort(self, rows, column, descending=False):
+        """rows reordered by column"""
+        order = self.order(column, descending)
+        selected = np.zeros(len(order), dtype=bool)
+        selected[rows] = True
+        return order[selected[order]]
+
+def sorted_selection(selection_cache, filter_state, sort_index, rows, column, descending):
+    """Selection rows in explorer sort order; column None keeps the dataset order
+
+    Only the latest sort of each selection is cached, so an entry holds at most two row arrays.
+    """
+    if column is None:
+        return rows
+    key = (column, descending)
+    cached_key, cached_order = selection_cache.part(filter_state, 'sorted', (None, None))
+    if cached_key == key:
+        return cached_order
+    ordered = sort_index.sort(rows, column, descending)
+    selection_cache.attach(filter_state, 'sorted', (key, ordered))
+    return ordered
+
+def explorer_page(df, page_rows):
+    """Program Explorer rows for one page, numeric columns left numeric"""
+    page_df = df.iloc[page_rows][EXPLORER_COLUMNS]
+    page_df['data_quality'] = page_df['data_quality'].str.title()
+    return page_df
+
+# Rows converted per step when writing an export, bounding the working memory
+EXPORT_CHUNK_ROWS = 50_000
+# Excel sheets stop at 1,048,576 rows, one of them the header
+EXCEL_MAX_ROWS = 1_048_575
+# Ingestion bookkeeping, not offered for export
+INTERNAL_COLUMNS = ['program_key', 'row_hash']
+
+def iter_export_chunks(df, columns, rows=None, chunk_rows=EXPORT_CHUNK_ROWS):
+    """Consecutive chunks of df's rows (all of them by default), projected to columns"""
+    rows = np.arange(len(df)) if rows is None else rows
+    # Take rows and columns together, so only one chunk of the selected columns is copied
+    positions = df.columns.get_indexer(columns)
+    for start in range(0, len(rows), chunk_rows):
+        yield df.iloc[rows[start:start + chunk_rows], positions]
+
+def write_csv_gzip(df, columns, out, rows=None):
+    """Gzip-compressed CSV, formatted and compressed chunk by chunk"""
+    import gzip
+    with gzip.GzipFile(fileobj=out, mode='wb', compresslevel=6, mtime=0) as archive:
+        archive.write(pd.DataFrame(columns=columns).to_csv(index=False).encode('utf-8'))
+        for chunk in iter_export_chunks(df, columns, rows):
+            archive.write(chunk.to_csv(index=False, header=False).encode('utf-8'))
+
+def write_parquet(df, columns, out, rows=None):
+    """Parquet file with one row group per chunk"""
+    import pyarrow.parquet as pq
+    writer = None
+    for chunk in iter_export_chunks(df, columns, rows):
+        table = pa.Table.from_pandas(chunk, schema=writer.schema if writer else None, preserve_index=False)
+        writer = writer or pq.ParquetWriter(out, table.schema)
+        writer.write_table(table)
+    if writer is None:
+        pq.write_table(pa.Table.from_pandas(df.iloc[:0][columns], preserve_index=False), out)
+    else:
+        writer.close()
+
+def write_excel(df, columns, out, rows=None):
+    """Excel workbook written row by row in XlsxWriter's constant-memory mode
+
+    Rows past EXCEL_MAX_ROWS are left out.
+    """
+    import xlsxwriter
+    # Program URLs stay plain text; a sheet holds at most 65,530 hyperlinks
+    workbook = xlsxwriter.Workbook(out, {
+        'constant_memory': True, 'default_date_format': 'yyyy-mm-dd',
+        'strings_to_urls': False, 'strings_to_formulas': False
+    })
+    sheet = workbook.add_worksheet('Programs')
+    sheet.write_row(0, 0, columns)
+    row = 1
+    rows = np.arange(len(df)) if rows is None else rows
+    for chunk in iter_export_chunks(df, columns, rows[:EXCEL_MAX_ROWS]):
+        chunk = chunk.astype(object).where(chunk.notna(), None)
+        for record in chunk.itertuples(index=False):
+            sheet.write_row(row, 0, record)
+            row += 1
+    workbook.close()
+
+# Label -> (file extension, MIME type, writer)
+EXPORT_FORMATS = {
+    'CSV (gzip)': ('csv.gz', 'application/gzip', write_csv_gzip),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet', write_parquet),
+    'Excel': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', write_excel),
+}
+
+def available_export_formats():
+    """Export formats whose writer can run here; Excel needs the optional XlsxWriter package"""
+    return [
+        label for label in EXPORT_FORMATS
+        if label != 'Excel' or importlib.util.find_spec('xlsxwriter') is not None
+    ]
+
+def export_bytes(df, columns, export_format, rows=None):
+    """The selected columns and rows of df as a file in one of EXPORT_FORMATS"""
+    out = io.BytesIO()
+    with timed('export'):
+        EXPORT_FORMATS[export_format][2](df, columns, out, rows)
+    return out.getvalue()
+
+# Outliers drawn per box; the rest stay on the server
+BOX_OUTLIER_SAMPLE_SIZE = 200
+
+def grouped_box_stats(filter_engine, rows, column, group_column):
+    """Tukey box statistics of a numeric column per group value, in one pass over the rows
+
+    Returns one dict per non-empty group, sorted by label, with quartiles, whisker ends
+    (the furthest values within 1.5 IQR of the box) and a random sample of at most
+    BOX_OUTLIER_SAMPLE_SIZE outliers next to the total outlier count.
+    """
+    labels = list(filter_engine.value_codes[group_column])
+    group_count = len(labels)
+    groups = filter_engine.codes[group_column][rows]
+    q1, median, q3 = filter_engine.quantiles(column, rows, [0.25, 0.5, 0.75], groups, group_count).T
+    low = q1 - 1.5 * (q3 - q1)
+    high = q3 + 1.5 * (q3 - q1)
+
+    values = filter_engine.numbers[column][rows]
+    present = ~np.isnan(values) & (groups >= 0)
+    values = values[present]
+    groups = groups[present]
+    inside = (values >= low[groups]) & (values <= high[groups])
+    lowerfence = np.full(group_count, np.inf)
+    upperfence = np.full(group_count, -np.inf)
+    np.minimum.at(lowerfence, groups[inside], values[inside])
+    np.maximum.at(upperfence, groups[inside], values[inside])
+    # Sketch quartiles can leave a tiny group with nothing inside its fences
+    lowerfence = np.where(np.isinf(lowerfence), q1, lowerfence)
+    upperfence = np.where(np.isinf(upperfence), q3, upperfence)
+
+    # Shuffle the outliers, then keep the first few of each group
+    outliers = np.flatnonzero(~inside)
+    outliers = outliers[np.random.default_rng(0).permutation(len(outliers))]
+    outliers = outliers[np.argsort(groups[outliers], kind='stable')]
+    outlier_groups = groups[outliers]
+    outlier_counts = np.bincount(outlier_groups, minlength=group_count)
+    group_starts = np.cumsum(outlier_counts) - outlier_counts
+    kept = np.arange(len(outliers)) - group_starts[outlier_groups] < BOX_OUTLIER_SAMPLE_SIZE
+    outliers = outliers[kept]
+    outlier_groups = outlier_groups[kept]
+
+    stats = []
+    for group in np.argsort(labels):
+        if np.isnan(median[group]):
+            continue
+        stats.append({
+            'label': labels[group],
+            'q1': q1[group],
+            'median': median[group],
+            'q3': q3[group],
+            'lowerfence': lowerfence[group],
+            'upperfence': upperfence[group],
+            'outliers': values[outliers[outlier_groups == group]],
+            'outlier_count': int(outlier_counts[group]),
+        })
+    return stats
@@ -1,11 +1,16 @@
 import streamlit as st
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
-from collections import Counter
-import numpy as np
-import re
+import threading
+from credscout_pipeline import incremental_changes
+from credscout_core import (
+    STAGE_TIMINGS, EXPORT_FORMATS, EXCEL_MAX_ROWS, INTERNAL_COLUMNS, ALL_ROWS_STATE, timed,
+    processed_cache_key, load_processed, SearchIndex, ProgramLookup, SkillTable, FilterEngine,
+    SelectionCache, SortIndex,
+    extract_top_skills, normalize_filter_state, select_filtered, cached_tab_content,
+    sorted_selection, explorer_page, available_export_formats, export_bytes
+)
+from credscout_charts import market_overview_content, skills_content, competitive_content
 
 # Page config
 st.set_page_config(
@@ -269,544 +274,128 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Load data function
-def clean_price(price_str):
-    """Extract numeric price from various formats"""
-    if pd.isna(price_str) or price_str == 'Unknown':
-        return None
-    clean = str(price_str).replace('$', '').replace(',', '').replace(' ', '').replace('CAD', '').replace('cad', '')
-    try:
-        return float(clean)
-    except:
-        return None
+@st.cache_resource
+def load_dataset(_uploaded_file, dataset_key):
+    """Processed frame and quality profile, loaded once per server and shared by all sessions
 
-def clean_duration(duration_str):
-    """Convert duration to weeks"""
-    if pd.isna(duration_str) or duration_str == 'Unknown':
-        return None
-    duration_str = str(duration_str).lower()
-    numbers = re.findall(r'\d+\.?\d*', duration_str)
-    if not numbers:
-        return None
-    num = float(numbers[0])
-    if 'month' in duration_str:
-        return num * 4
-    elif 'week' in duration_str:
-        return num
-    elif 'day' in duration_str:
-        return num / 7
-    elif 'hour' in duration_str:
-        return num / 40
-    elif 'year' in duration_str:
-        return num * 52
-    return None
+    The frame is memory-mapped read-only from the on-disk cache and never copied per
+    session or rerun; sessions only hold row selections of it. Keyed by the upload's
+    content hash, so the file itself is not re-hashed on every rerun.
+    """
+    return load_processed(_uploaded_file, dataset_key)
 
-def categorize_offering_level(row):
-    """Categorize offering into levels"""
-    cred_type = str(row.get('credential_type', '')).lower()
-    price = row.get('price_cad')
-    duration = row.get('duration_weeks')
-    if (price and price < 500) or (duration and duration < 2):
-        return 'micro_learning'
-    if (price and price > 5000) or (duration and duration > 24):
-        return 'diploma'
-    if 'course' in cred_type and price and price < 1000:
-        return 'course'
-    if 'certificate' in cred_type or 'credential' in cred_type:
-        if price and price > 2000:
-            return 'certificate_advanced'
-        return 'certificate'
-    if 'professional' in cred_type or 'statement' in cred_type:
-        return 'professional_development'
-    return 'certificate'
+def upload_dataset_key(uploaded_file):
+    """Content hash of the uploaded file, computed once per upload in each session"""
+    if st.session_state.get('dataset_file_id') != uploaded_file.file_id:
+        st.session_state.dataset_key = processed_cache_key(uploaded_file)
+        st.session_state.dataset_file_id = uploaded_file.file_id
+    return st.session_state.dataset_key
 
-@st.cache_data
-def load_data(uploaded_file):
-    """Load and process CSV data - handles headerless raw data or preprocessed data"""
-    
-    # Try reading first - see if it has headers
-    try:
-        test_df = pd.read_csv(uploaded_file, nrows=1)
-        uploaded_file.seek(0)  # Reset file pointer
-        
-        # Check if first row looks like data or headers
-        if 'program_id' in test_df.columns or 'offering_level' in test_df.columns:
-            # Preprocessed data with headers
-            df = pd.read_csv(uploaded_file)
-            df['date_added'] = pd.to_datetime(df['date_added'], errors='coerce')
-            return df
-    except:
-        pass
-    
-    uploaded_file.seek(0)  # Reset file pointer
-    
-    # Assume headerless raw format
-    df = pd.read_csv(
-        uploaded_file,
-        header=None,
-        names=[
-            'institution', 'program_name', 'credential_type', 'delivery_mode',
-            'duration', 'skills', 'price', 'description', 'url', 'scraped_date'
-        ]
-    )
-    
-    # Rename to expected format
-    df['title'] = df['program_name']
-    df['program_url'] = df['url']
-    df['program_id'] = range(1, len(df) + 1)
-    df['province'] = 'Unknown'
-    
-    # Clean prices
-    df['price_cad'] = df['price'].apply(clean_price)
-    df['price_display'] = df['price']
-    
-    # Clean durations
-    df['duration_weeks'] = df['duration'].apply(clean_duration)
-    df['duration_display'] = df['duration']
-    
-    # Categorize offering levels
-    df['offering_level'] = df.apply(categorize_offering_level, axis=1)
-    
-    # Add data quality
-    def assess_quality(row):
-        unknown_count = sum([
-            1 for col in ['credential_type', 'delivery_mode', 'duration', 'skills', 'price', 'description']
-            if pd.isna(row.get(col)) or row.get(col) == 'Unknown' or row.get(col) == ''
-        ])
-        return 'poor' if unknown_count >= 4 else ('moderate' if unknown_count >= 2 else 'good')
-    
-    df['data_quality'] = df.apply(assess_quality, axis=1)
-    df['date_added'] = pd.to_datetime(df['scraped_date'], errors='coerce')
-    
-    return df
+# Past this share of new or changed rows a full rebuild is about as cheap as a delta update
+DELTA_MAX_FRACTION = 0.5
 
-def estimate_unique_programs(df):
-    """Calculate Lightcast-style estimates"""
-    total = len(df)
-    course_count = len(df[df['offering_level'] == 'course'])
-    
-    # Assume 4 courses ≈ 1 certificate
-    estimated_programs_from_courses = course_count / 4
-    non_course_count = total - course_count
-    estimated_unique = int(non_course_count + estimated_programs_from_courses)
-    
-    return {
-        'total': total,
-        'estimated_unique': estimated_unique,
-        'course_count': course_count
-    }
+@st.cache_resource
+def latest_derived_structures():
+    """Most recently built structure of each kind, with the row keys it was built from"""
+    return {'lock': threading.Lock()}
 
-# Page config
-st.set_page_config(
-    page_title="CredScout Intelligence Platform",
-    page_icon="🎓",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
+def build_with_delta(kind, df, build, update):
+    """Build a derived structure, updating the latest one by delta when df extends its rows
 
-# Ultra-professional CSS
-st.markdown("""
-<style>
-    @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700&display=swap');
-    
-    * {
-        font-family: 'Inter', -apple-system, BlinkMacSystemFont, sans-serif;
-    }
-    
-    .main {
-        background-color: #f7f8fa;
-        padding: 0;
-    }
-    
-    .block-container {
-        padding-top: 2rem;
-        padding-bottom: 2rem;
-        max-width: 1400px;
-    }
-    
-    .credscout-header {
-        background: white;
-        padding: 1.75rem 2.5rem;
-        margin: -2rem -2rem 2.5rem -2rem;
-        border-bottom: 1px solid #e5e7eb;
-    }
-    
-    .credscout-logo {
-        font-size: 1.5rem;
-        font-weight: 700;
-        color: #111827;
-        letter-spacing: -0.02em;
-    }
-    
-    .credscout-logo-accent {
-        color: #3b82f6;
-    }
-    
-    .credscout-tagline {
-        font-size: 0.875rem;
-        color: #6b7280;
-        font-weight: 400;
-        margin-top: 0.25rem;
-    }
-    
-    .search-box {
-        background: white;
-        padding: 2rem;
-        border-radius: 12px;
-        border: 1px solid #e5e7eb;
-        margin-bottom: 2rem;
-    }
-    
-    .search-result-badge {
-        display: inline-block;
-        background: #eff6ff;
-        color: #1e40af;
-        padding: 0.5rem 1rem;
-        border-radius: 8px;
-        font-size: 0.875rem;
-        font-weight: 500;
-        margin-right: 0.5rem;
-        border: 1px solid #bfdbfe;
-    }
-    
-    .metric-card {
-        background: white;
-        padding: 1.75rem;
-        border-radius: 12px;
-        border: 1px solid #e5e7eb;
-        height: 100%;
-        transition: all 0.2s ease;
-    }
-    
-    .metric-card:hover {
-        border-color: #cbd5e1;
-        box-shadow: 0 1px 3px 0 rgba(0, 0, 0, 0.05);
-    }
-    
-    .metric-label {
-        font-size: 0.875rem;
-        color: #6b7280;
-        font-weight: 500;
-        margin-bottom: 0.75rem;
-        letter-spacing: -0.01em;
-    }
-    
-    .metric-value {
-        font-size: 2.25rem;
-        font-weight: 700;
-        color: #111827;
-        line-height: 1;
-        margin-bottom: 0.5rem;
-        letter-spacing: -0.02em;
-    }
-    
-    .metric-delta {
-        font-size: 0.8125rem;
-        color: #6b7280;
-        font-weight: 400;
-    }
-    
-    .section-subheader {
-        font-size: 0.9375rem;
-        font-weight: 600;
-        color: #374151;
-        margin: 1.5rem 0 1rem 0;
-        letter-spacing: -0.01em;
-    }
-    
-    .insight-card {
-        background: white;
-        padding: 1.5rem;
-        border-radius: 12px;
-        border: 1px solid #e5e7eb;
-        margin-bottom: 1rem;
-        transition: all 0.2s ease;
-    }
-    
-    .insight-card:hover {
-        border-color: #cbd5e1;
-    }
-    
-    .badge-note {
-        display: inline-block;
-        background: #f3f4f6;
-        color: #6b7280;
-        font-size: 0.75rem;
-        font-weight: 500;
-        padding: 0.25rem 0.625rem;
-        border-radius: 6px;
-        margin-left: 0.5rem;
-        letter-spacing: -0.01em;
-    }
-    
-    .stSelectbox label, .stSlider label, .stTextInput label, .stMultiSelect label {
-        font-size: 0.875rem;
-        font-weight: 500;
-        color: #374151;
-        margin-bottom: 0.5rem;
-    }
-    
-    .stButton>button {
-        background-color: #3b82f6;
-        color: white;
-        border: none;
-        border-radius: 8px;
-        padding: 0.625rem 1.25rem;
-        font-weight: 500;
-        font-size: 0.875rem;
-        transition: all 0.2s;
-        letter-spacing: -0.01em;
-    }
-    
-    .stButton>button:hover {
-        background-color: #2563eb;
-        box-shadow: 0 4px 6px -1px rgba(0, 0, 0, 0.1);
-    }
-    
-    .stDownloadButton>button {
-        background-color: white;
-        color: #374151;
-        border: 1px solid #d1d5db;
-        border-radius: 8px;
-        padding: 0.625rem 1.25rem;
-        font-weight: 500;
-        font-size: 0.875rem;
-        transition: all 0.2s;
-    }
-    
-    .stDownloadButton>button:hover {
-        border-color: #9ca3af;
-        background-color: #f9fafb;
-    }
-    
-    .stTabs [data-baseweb="tab-list"] {
-        gap: 0;
-        background: white;
-        border-radius: 12px;
-        border: 1px solid #e5e7eb;
-        padding: 0.25rem;
-        margin-bottom: 1.5rem;
-    }
-    
-    .stTabs [data-baseweb="tab"] {
-        padding: 0.625rem 1.25rem;
-        font-weight: 500;
-        font-size: 0.875rem;
-        color: #6b7280;
-        border-radius: 8px;
-        background: transparent;
-        letter-spacing: -0.01em;
-    }
-    
-    .stTabs [aria-selected="true"] {
-        background-color: white;
-        color: #111827;
-        box-shadow: 0 1px 2px 0 rgba(0, 0, 0, 0.05);
-    }
-    
-    .dataframe {
-        font-size: 0.875rem;
-        border: 1px solid #e5e7eb !important;
-        border-radius: 12px;
-    }
-    
-    section[data-testid="stSidebar"] {
-        background-color: white;
-        border-right: 1px solid #e5e7eb;
-    }
-    
-    section[data-testid="stSidebar"] > div {
-        padding-top: 2rem;
-    }
-    
-    #MainMenu {visibility: hidden;}
-    footer {visibility: hidden;}
-    header {visibility: hidden;}
-    
-    .info-box {
-        background: #eff6ff;
-        border-left: 3px solid #3b82f6;
-        padding: 1rem;
-        border-radius: 6px;
-        font-size: 0.875rem;
-        color: #1e40af;
-        margin: 1rem 0;
-    }
-    
-    .quick-search-tags {
-        margin-top: 1rem;
-    }
-    
-    .quick-tag {
-        display: inline-block;
-        background: white;
-        border: 1px solid #d1d5db;
-        color: #374151;
-        padding: 0.5rem 1rem;
-        border-radius: 6px;
-        font-size: 0.8125rem;
-        margin-right: 0.5rem;
-        margin-bottom: 0.5rem;
-        cursor: pointer;
-        transition: all 0.2s;
-    }
-    
-    .quick-tag:hover {
-        background: #f3f4f6;
-        border-color: #9ca3af;
-    }
-</style>
-""", unsafe_allow_html=True)
+    Frames from an incremental merge keep earlier programs in place and append new ones,
+    so only their changed and appended rows need processing.
+    """
+    if 'program_key' not in df or 'row_hash' not in df:
+        return build(df)
+    keys, hashes = df['program_key'].to_numpy(), df['row_hash'].to_numpy()
+    latest = latest_derived_structures()
+    with latest['lock']:
+        previous = latest.get(kind)
 
-# Load data function
-def clean_price(price_str):
-    """Extract numeric price from various formats"""
-    if pd.isna(price_str) or price_str == 'Unknown':
-        return None
-    clean = str(price_str).replace('$', '').replace(',', '').replace(' ', '').replace('CAD', '').replace('cad', '')
-    try:
-        return float(clean)
-    except:
-        return None
+    structure = None
+    if previous is not None:
+        old_keys, old_hashes, old_structure = previous
+        changed = incremental_changes(old_keys, old_hashes, keys, hashes)
+        if changed is not None and len(changed) + len(df) - len(old_keys) <= DELTA_MAX_FRACTION * len(df):
+            structure = update(old_structure, changed)
+    if structure is None:
+        structure = build(df)
 
-def clean_duration(duration_str):
-    """Convert duration to weeks"""
-    if pd.isna(duration_str) or duration_str == 'Unknown':
-        return None
-    duration_str = str(duration_str).lower()
-    numbers = re.findall(r'\d+\.?\d*', duration_str)
-    if not numbers:
-        return None
-    num = float(numbers[0])
-    if 'month' in duration_str:
-        return num * 4
-    elif 'week' in duration_str:
-        return num
-    elif 'day' in duration_str:
-        return num / 7
-    elif 'hour' in duration_str:
-        return num / 40
-    elif 'year' in duration_str:
-        return num * 52
-    return None
+    with latest['lock']:
+        latest[kind] = (keys, hashes, structure)
+    return structure
 
-def categorize_offering_level(row):
-    """Categorize offering into levels"""
-    cred_type = str(row.get('credential_type', '')).lower()
-    price = row.get('price_cad')
-    duration = row.get('duration_weeks')
-    if (price and price < 500) or (duration and duration < 2):
-        return 'micro_learning'
-    if (price and price > 5000) or (duration and duration > 24):
-        return 'diploma'
-    if 'course' in cred_type and price and price < 1000:
-        return 'course'
-    if 'certificate' in cred_type or 'credential' in cred_type:
-        if price and price > 2000:
-            return 'certificate_advanced'
-        return 'certificate'
-    if 'professional' in cred_type or 'statement' in cred_type:
-        return 'professional_development'
-    return 'certificate'
+# Structures derived from the shared frame are cached by its dataset_key; hashing the
+# frame itself on every rerun would cost more than most reruns
+@st.cache_resource
+def build_search_index(_df, dataset_key):
+    """Build the search index once per dataset and share it across sessions"""
+    return build_with_delta(
+        'search_index', _df, SearchIndex, lambda index, changed: index.updated(_df, changed)
+    )
 
-@st.cache_data
-def load_data(uploaded_file):
-    """Load and process CSV data - handles headerless raw data or preprocessed data"""
-    
-    # Try reading first - see if it has headers
-    try:
-        test_df = pd.read_csv(uploaded_file, nrows=1)
-        uploaded_file.seek(0)  # Reset file pointer
-        
-        # Check if first row looks like data or headers
-        if 'program_id' in test_df.columns or 'offering_level' in test_df.columns:
-            # Preprocessed data with headers
-            df = pd.read_csv(uploaded_file)
-            df['date_added'] = pd.to_datetime(df['date_added'], errors='coerce')
-            return df
-    except:
-        pass
-    
-    uploaded_file.seek(0)  # Reset file pointer
-    
-    # Assume headerless raw format
-    df = pd.read_csv(
-        uploaded_file,
-        header=None,
-        names=[
-            'institution', 'program_name', 'credential_type', 'delivery_mode',
-            'duration', 'skills', 'price', 'description', 'url', 'scraped_date'
-        ]
+@st.cache_resource
+def build_program_lookup(_df, dataset_key):
+    """Build the program lookup once per dataset and share it across sessions"""
+    return ProgramLookup(_df)
+
+@st.cache_resource
+def build_skill_table(_df, dataset_key):
+    """Parse the skills column once per dataset and share the table across sessions"""
+    return build_with_delta(
+        'skill_table', _df, lambda df: SkillTable(df['skills']),
+        lambda table, changed: table.updated(_df['skills'], changed)
     )
-    
-    # Rename to expected format
-    df['title'] = df['program_name']
-    df['program_url'] = df['url']
-    df['program_id'] = range(1, len(df) + 1)
-    df['province'] = 'Unknown'
-    
-    # Clean prices
-    df['price_cad'] = df['price'].apply(clean_price)
-    df['price_display'] = df['price']
-    
-    # Clean durations
-    df['duration_weeks'] = df['duration'].apply(clean_duration)
-    df['duration_display'] = df['duration']
-    
-    # Categorize offering levels
-    df['offering_level'] = df.apply(categorize_offering_level, axis=1)
-    
-    # Add data quality
-    def assess_quality(row):
-        unknown_count = sum([
-            1 for col in ['credential_type', 'delivery_mode', 'duration', 'skills', 'price', 'description']
-            if pd.isna(row.get(col)) or row.get(col) == 'Unknown' or row.get(col) == ''
-        ])
-        return 'poor' if unknown_count >= 4 else ('moderate' if unknown_count >= 2 else 'good')
-    
-    df['data_quality'] = df.apply(assess_quality, axis=1)
-    df['date_added'] = pd.to_datetime(df['scraped_date'], errors='coerce')
-    
-    return df
 
-def extract_top_skills(df, top_n=50):
-    """Extract top skills from the dataset"""
-    all_skills = []
-    for skills_str in df['skills'].dropna():
-        if skills_str != 'Unknown':
-            skills_list = [s.strip() for s in str(skills_str).split(',')]
-            all_skills.extend(skills_list)
-    
-    if all_skills:
-        skill_counts = Counter(all_skills)
-        return [skill for skill, count in skill_counts.most_common(top_n)]
-    return []
+@st.cache_resource
+def build_filter_engine(_df, dataset_key):
+    """Precompute filter codes once per dataset and share them across sessions"""
+    return FilterEngine(_df)
 
-# Header
-st.markdown("""
-<div class="credscout-header">
-    <div>
-        <div class="credscout-logo"><span class="credscout-logo-accent">Cred</span>Scout Intelligence</div>
-        <div class="credscout-tagline">The Intelligence Layer for Continuing Education</div>
-    </div>
-</div>
-""", unsafe_allow_html=True)
+@st.cache_resource
+def build_selection_cache(_df, dataset_key):
+    """One selection cache per dataset, shared across sessions"""
+    return SelectionCache()
 
-# File uploader
-uploaded_file = st.file_uploader(
-    "Upload Processed Dataset",
-    type=['csv'],
-    help="Use the preprocessed CSV file from preprocess_cpe_data.py",
-    label_visibility="collapsed"
-)
+def render_chart(fig):
+    """st.plotly_chart, timed; serializing the figure is most of the cost"""
+    with timed('plotly_chart'):
+        st.plotly_chart(fig, width="stretch")
 
-if uploaded_file is not None:
-    # Load data
-    df = load_data(uploaded_file)
-    
-    # Extract top skills for quick search
-    top_skills = extract_top_skills(df, top_n=20)
-    
+# Program Explorer columns with their labels and display formats; blank cells are unknown
+EXPLORER_COLUMN_CONFIG = {
+    'title': st.column_config.TextColumn('Program'),
+    'institution': st.column_config.TextColumn('Institution'),
+    'credential_type': st.column_config.TextColumn('Type'),
+    'offering_level': st.column_config.TextColumn('Level'),
+    'delivery_mode': st.column_config.TextColumn('Delivery'),
+    'duration_weeks': st.column_config.NumberColumn('Duration', format='%.0fw'),
+    'price_cad': st.column_config.NumberColumn('Price', format='$%,.0f'),
+    'data_quality': st.column_config.TextColumn('Quality'),
+}
+EXPLORER_PAGE_SIZES = [25, 50, 100, 250]
+
+@st.cache_resource
+def build_sort_index(_df, dataset_key):
+    """One sort index per dataset, shared across sessions"""
+    return SortIndex(_df)
+
+def program_option_label(df, program_lookup, program_id):
+    """Title and institution of a program, to tell programs with the same title apart"""
+    row = program_lookup.row(program_id)
+    title, institution = df['title'].iat[row], df['institution'].iat[row]
+    return title if pd.isna(institution) else f"{title} · {institution}"
+
+def reset_explorer_page():
+    """Widget callback: a new sort starts from the first page"""
+    st.session_state.explorer_page = 1
+
+def set_search(term):
+    """Button callback that fills in (or clears) the main search box"""
+    st.session_state.main_search = term
+
+def render_search_bar(top_skills):
+    """Main search box with popular-search tags; returns the search term"""
     # PROMINENT SEARCH BOX (Main area, not sidebar)
     st.markdown('<div class="search-box">', unsafe_allow_html=True)
     
@@ -821,9 +410,7 @@ if uploaded_file is not None:
         )
     
     with col2:
-        if st.button("Clear Search", use_container_width=True):
-            st.session_state.main_search = ""
-            st.rerun()
+        st.button("Clear Search", width="stretch", on_click=set_search, args=("",))
     
     # Quick search tags
     if not search_term and len(top_skills) > 0:
@@ -834,146 +421,174 @@ if uploaded_file is not None:
         tag_cols = st.columns(8)
         for idx, skill in enumerate(top_skills[:8]):
             with tag_cols[idx % 8]:
-                if st.button(skill, key=f"tag_{idx}", use_container_width=True):
-                    st.session_state.main_search = skill
-                    st.rerun()
+                st.button(skill, key=f"tag_{idx}", width="stretch", on_click=set_search, args=(skill,))
         
         st.markdown('</div>', unsafe_allow_html=True)
     
     st.markdown('</div>', unsafe_allow_html=True)
-    
-    # Sidebar filters (keep existing)
+    return search_term
+
+def reset_filters():
+    """Button callback that returns every sidebar filter to its default"""
+    for key in [key for key in st.session_state if str(key).startswith('filter_')]:
+        del st.session_state[key]
+
+def render_filter_sidebar(filter_engine, quality_profile):
+    """Sidebar filters in one form, so several changes apply in a single rerun
+
+    Returns (selected values, price range, duration range) as last submitted.
+    """
     st.sidebar.markdown("### Advanced Filters")
     st.sidebar.markdown("")
     
-    # Offering Level filter
-    offering_levels = ['All Levels'] + sorted(df['offering_level'].dropna().unique().tolist())
-    selected_offering_level = st.sidebar.selectbox(
-        "Offering Level",
-        offering_levels,
-        help="Categorized by duration and price signals"
-    )
-    
-    # Credential Type filter
-    credential_types = ['All Types'] + sorted(df['credential_type'].dropna().unique().tolist())
-    selected_credential = st.sidebar.selectbox(
-        "Credential Type",
-        credential_types
-    )
-    
-    # Institution filter
-    institutions = ['All Institutions'] + sorted(df['institution'].dropna().unique().tolist())
-    selected_institution = st.sidebar.selectbox(
-        "Institution",
-        institutions
-    )
-    
-    # Delivery Mode filter
-    delivery_modes = ['All Modes'] + sorted(df['delivery_mode'].dropna().unique().tolist())
-    selected_delivery = st.sidebar.selectbox(
-        "Delivery Mode",
-        delivery_modes
-    )
-    
-    # Data Quality filter
-    quality_levels = ['All Quality Levels', 'Good', 'Moderate', 'Poor']
-    selected_quality = st.sidebar.selectbox(
-        "Data Quality",
-        quality_levels,
-        help="Filter by data completeness"
-    )
-    
-    # Price range filter
-    prices = df['price_cad'].dropna()
-    if len(prices) > 0:
-        min_price = int(prices.min())
-        max_price = int(prices.max())
-        price_range = st.sidebar.slider(
-            "Price Range (CAD)",
-            min_value=min_price,
-            max_value=max_price,
-            value=(min_price, max_price),
-            step=100
+    with st.sidebar.form("filters", border=False):
+        # Offering Level filter
+        offering_levels = ['All Levels'] + filter_engine.options('offering_level')
+        selected_offering_level = st.selectbox(
+            "Offering Level",
+            offering_levels,
+            key="filter_offering_level",
+            help="Categorized by duration and price signals"
         )
-    else:
-        price_range = (0, 10000)
-    
-    # Duration range filter
-    durations = df['duration_weeks'].dropna()
-    if len(durations) > 0:
-        min_duration = int(durations.min())
-        max_duration = int(durations.max())
-        duration_range = st.sidebar.slider(
-            "Duration (weeks)",
-            min_value=min_duration,
-            max_value=max_duration,
-            value=(min_duration, max_duration)
+        
+        # Credential Type filter
+        credential_types = ['All Types'] + filter_engine.options('credential_type')
+        selected_credential = st.selectbox(
+            "Credential Type",
+            credential_types,
+            key="filter_credential_type"
         )
-    else:
-        duration_range = (0, 52)
-    
-    st.sidebar.markdown("")
+        
+        # Institution filter
+        institutions = ['All Institutions'] + filter_engine.options('institution')
+        selected_institution = st.selectbox(
+            "Institution",
+            institutions,
+            key="filter_institution"
+        )
+        
+        # Delivery Mode filter
+        delivery_modes = ['All Modes'] + filter_engine.options('delivery_mode')
+        selected_delivery = st.selectbox(
+            "Delivery Mode",
+            delivery_modes,
+            key="filter_delivery_mode"
+        )
+        
+        # Data Quality filter
+        quality_levels = ['All Quality Levels', 'Good', 'Moderate', 'Poor']
+        selected_quality = st.selectbox(
+            "Data Quality",
+            quality_levels,
+            key="filter_data_quality",
+            help="Filter by data completeness"
+        )
+        
+        # Price range filter
+        price_bounds = filter_engine.bounds('price_cad')
+        if price_bounds is not None:
+            min_price = int(price_bounds[0])
+            max_price = int(price_bounds[1])
+            price_range = st.slider(
+                "Price Range (CAD)",
+                key="filter_price",
+                min_value=min_price,
+                max_value=max_price,
+                value=(min_price, max_price),
+                step=100
+            )
+        else:
+            price_range = (0, 10000)
+        
+        # Duration range filter
+        duration_bounds = filter_engine.bounds('duration_weeks')
+        if duration_bounds is not None:
+            min_duration = int(duration_bounds[0])
+            max_duration = int(duration_bounds[1])
+            duration_range = st.slider(
+                "Duration (weeks)",
+                key="filter_duration",
+                min_value=min_duration,
+                max_value=max_duration,
+                value=(min_duration, max_duration)
+            )
+        else:
+            duration_range = (0, 52)
+        
+        st.form_submit_button("Apply Filters", type="primary", width="stretch")
     
     # Clear filters button
-    if st.sidebar.button("Reset All Filters", use_container_width=True):
-        st.rerun()
-    
-    # Apply filters
-    filtered_df = df.copy()
+    st.sidebar.button("Reset All Filters", width="stretch", on_click=reset_filters)
+    
+    # Data quality profile (computed once at load time)
+    with st.sidebar.expander("Data Completeness"):
+        completeness_df = pd.DataFrame({
+            'Field': [col.replace('_', ' ').title() for col in quality_profile.index],
+            'Complete': (quality_profile['completeness'] * 100).round(1).to_numpy(),
+            'Missing': quality_profile['missing'].to_numpy()
+        })
+        st.dataframe(
+            completeness_df,
+            hide_index=True,
+            width="stretch",
+            column_config={'Complete': st.column_config.ProgressColumn('Complete', format='%.1f%%', min_value=0, max_value=100)}
+        )
     
-    # Search filter (from main search box)
-    if search_term:
-        search_term_lower = search_term.lower()
-        filtered_df = filtered_df[
-            filtered_df['title'].str.lower().str.contains(search_term_lower, na=False) |
-            filtered_df['institution'].str.lower().str.contains(search_term_lower, na=False) |
-            filtered_df['skills'].str.lower().str.contains(search_term_lower, na=False) |
-            filtered_df['description'].str.lower().str.contains(search_term_lower, na=False)
-        ]
-    
-    # Offering level filter
+    # Selected values per filter column
+    selected_values = {}
     if selected_offering_level != 'All Levels':
-        filtered_df = filtered_df[filtered_df['offering_level'] == selected_offering_level]
-    
-    # Credential type filter
+        selected_values['offering_level'] = selected_offering_level
     if selected_credential != 'All Types':
-        filtered_df = filtered_df[filtered_df['credential_type'] == selected_credential]
-    
-    # Institution filter
+        selected_values['credential_type'] = selected_credential
     if selected_institution != 'All Institutions':
-        filtered_df = filtered_df[filtered_df['institution'] == selected_institution]
-    
-    # Delivery mode filter
+        selected_values['institution'] = selected_institution
     if selected_delivery != 'All Modes':
-        filtered_df = filtered_df[filtered_df['delivery_mode'] == selected_delivery]
-    
-    # Data quality filter
+        selected_values['delivery_mode'] = selected_delivery
     if selected_quality != 'All Quality Levels':
-        filtered_df = filtered_df[filtered_df['data_quality'] == selected_quality.lower()]
-    
-    # Price filter
-    filtered_df = filtered_df[
-        (filtered_df['price_cad'].isna()) |
-        ((filtered_df['price_cad'] >= price_range[0]) & (filtered_df['price_cad'] <= price_range[1]))
-    ]
-    
-    # Duration filter
-    filtered_df = filtered_df[
-        (filtered_df['duration_weeks'].isna()) |
-        ((filtered_df['duration_weeks'] >= duration_range[0]) & (filtered_df['duration_weeks'] <= duration_range[1]))
-    ]
-    
-    # Calculate estimates
-    full_estimates = estimate_unique_programs(df)
-    filtered_estimates = estimate_unique_programs(filtered_df)
-    
+        selected_values['data_quality'] = selected_quality.lower()
+    return selected_values, price_range, duration_range
+
+def render_diagnostics():
+    """Opt-in sidebar panel with per-stage latencies from the timing buffer"""
+    if st.sidebar.toggle("Show diagnostics", key="show_diagnostics"):
+        with st.sidebar:
+            diagnostics_panel()
+
+@st.fragment
+def diagnostics_panel():
+    """Stage latency percentiles and timing log export; Refresh reruns only this panel"""
+    timings = STAGE_TIMINGS
+    st.markdown("**Stage latency (ms)**")
+    st.dataframe(
+        timings.summary(),
+        hide_index=True,
+        width="stretch",
+        column_config={
+            column: st.column_config.NumberColumn(column.replace('_ms', ''), format='%.1f')
+            for column in ['p50_ms', 'p95_ms', 'p99_ms', 'last_ms']
+        }
+    )
+    refresh_col, export_col = st.columns(2)
+    with refresh_col:
+        st.button("Refresh", key="refresh_diagnostics", width="stretch")
+    with export_col:
+        st.download_button(
+            label="Export log",
+            data=timings.log_lines,
+            file_name=f"credscout_timings_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl",
+            mime="application/x-ndjson",
+            width="stretch"
+        )
+
+def render_metrics(search_term, df, filtered_rows, filtered_estimates, full_estimates):
+    """Search badge, headline metric cards and the note on how they are estimated"""
     # Search Results Badge (if searching)
     if search_term:
-        unique_institutions_in_search = filtered_df['institution'].nunique()
+        unique_institutions_in_search = filtered_estimates['institutions']
         st.markdown(f"""
         <div style="margin-bottom: 1.5rem;">
             <span class="search-result-badge">
-                🔍 Found {len(filtered_df):,} offerings for "{search_term}" across {unique_institutions_in_search} institutions
+                🔍 Found {len(filtered_rows):,} offerings for "{search_term}" across {unique_institutions_in_search} institutions
             </span>
         </div>
         """, unsafe_allow_html=True)
@@ -985,14 +600,14 @@ if uploaded_file is not None:
         st.markdown(f"""
         <div class="metric-card">
             <div class="metric-label">Total Offerings</div>
-            <div class="metric-value">{len(filtered_df):,}</div>
+            <div class="metric-value">{len(filtered_rows):,}</div>
             <div class="metric-delta">~{filtered_estimates['estimated_unique']:,} unique programs</div>
         </div>
         """, unsafe_allow_html=True)
     
     with col2:
-        unique_institutions = filtered_df['institution'].nunique()
-        total_institutions = df['institution'].nunique()
+        unique_institutions = filtered_estimates['institutions']
+        total_institutions = full_estimates['institutions']
         st.markdown(f"""
         <div class="metric-card">
             <div class="metric-label">Institutions</div>
@@ -1002,8 +617,8 @@ if uploaded_file is not None:
         """, unsafe_allow_html=True)
     
     with col3:
-        avg_price = filtered_df['price_cad'].mean()
-        median_price = filtered_df['price_cad'].median()
+        avg_price = filtered_estimates['avg_price']
+        median_price = filtered_estimates['median_price']
         if pd.notna(avg_price):
             st.markdown(f"""
             <div class="metric-card">
@@ -1023,7 +638,7 @@ if uploaded_file is not None:
     
     with col4:
         thirty_days_ago = datetime.now() - timedelta(days=30)
-        new_programs = len(filtered_df[filtered_df['date_added'] >= thirty_days_ago])
+        new_programs = int((df['date_added'].iloc[filtered_rows] >= thirty_days_ago).sum())
         st.markdown(f"""
         <div class="metric-card">
             <div class="metric-label">Recently Added</div>
@@ -1042,322 +657,316 @@ if uploaded_file is not None:
     """, unsafe_allow_html=True)
     
     st.markdown("<br>", unsafe_allow_html=True)
+
+@st.fragment
+def overview_tab(selection_cache, filter_state, df, filtered_rows):
+    """Market Overview tab, rerun on its own"""
+    overview = cached_tab_content(
+        selection_cache, filter_state, 'overview', lambda: market_overview_content(df.iloc[filtered_rows])
+    )
+    col1, col2 = st.columns(2)
     
-    # Tabs
-    tab1, tab2, tab3, tab4 = st.tabs(["Market Overview", "Skills Intelligence", "Program Explorer", "Competitive Analysis"])
+    with col1:
+        st.markdown('<div class="section-subheader">By Offering Level</div>', unsafe_allow_html=True)
+        render_chart(overview['level'])
     
-    with tab1:
-        col1, col2 = st.columns(2)
+    with col2:
+        st.markdown('<div class="section-subheader">By Credential Type</div>', unsafe_allow_html=True)
+        render_chart(overview['credential'])
+    
+    st.markdown('<div class="section-subheader">Top Institutions by Volume</div>', unsafe_allow_html=True)
+    render_chart(overview['institutions'])
+    
+    st.markdown('<div class="section-subheader">Price vs. Duration Analysis</div>', unsafe_allow_html=True)
+    if overview['scatter'] is not None:
+        render_chart(overview['scatter'])
+        if overview['scatter_note']:
+            st.caption(overview['scatter_note'])
+    else:
+        st.info("Not enough data with both price and duration for scatter plot")
+
+@st.fragment
+def skills_tab(selection_cache, filter_state, skill_table, filtered_rows):
+    """Skills Intelligence tab, rerun on its own"""
+    skills = cached_tab_content(
+        selection_cache, filter_state, 'skills', lambda: skills_content(skill_table, filtered_rows)
+    )
+    
+    if skills is not None:
+        col1, col2 = st.columns([2, 1])
         
         with col1:
-            st.markdown('<div class="section-subheader">By Offering Level</div>', unsafe_allow_html=True)
-            level_dist = filtered_df['offering_level'].value_counts()
-            fig_level = px.pie(
-                values=level_dist.values,
-                names=level_dist.index,
-                hole=0.4,
-                color_discrete_sequence=['#3b82f6', '#8b5cf6', '#ec4899', '#f59e0b', '#10b981']
-            )
-            fig_level.update_traces(
-                textposition='outside',
-                textinfo='label+percent',
-                textfont_size=13
-            )
-            fig_level.update_layout(
-                showlegend=False,
-                margin=dict(l=20, r=20, t=20, b=20),
-                height=320,
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                font=dict(family='Inter', color='#374151')
-            )
-            st.plotly_chart(fig_level, use_container_width=True)
+            st.markdown('<div class="section-subheader">Top Skills in Market</div>', unsafe_allow_html=True)
+            render_chart(skills['figure'])
         
         with col2:
-            st.markdown('<div class="section-subheader">By Credential Type</div>', unsafe_allow_html=True)
-            cred_dist = filtered_df['credential_type'].value_counts().head(6)
-            fig_cred = px.pie(
-                values=cred_dist.values,
-                names=cred_dist.index,
-                hole=0.4,
-                color_discrete_sequence=['#3b82f6', '#10b981', '#f59e0b', '#ec4899', '#8b5cf6', '#6366f1']
-            )
-            fig_cred.update_traces(
-                textposition='outside',
-                textinfo='label+percent',
-                textfont_size=13
-            )
-            fig_cred.update_layout(
-                showlegend=False,
-                margin=dict(l=20, r=20, t=20, b=20),
-                height=320,
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                font=dict(family='Inter', color='#374151')
+            st.markdown('<div class="section-subheader">Market Leaders</div>', unsafe_allow_html=True)
+            
+            for idx, row in skills['leaders'].iterrows():
+                st.markdown(f"""
+                <div class="insight-card">
+                    <div style="font-weight: 600; color: #111827; margin-bottom: 0.375rem; font-size: 0.9375rem;">{row['Skill']}</div>
+                    <div style="color: #6b7280; font-size: 0.8125rem;">{row['Count']} mentions • {row['Percentage']}% of market</div>
+                </div>
+                """, unsafe_allow_html=True)
+    else:
+        st.info("No skills data available for current filters")
+
+@st.fragment
+def explorer_tab(
+    selection_cache, filter_state, df, skill_table, sort_index, program_lookup,
+    filtered_rows, filtered_estimates
+):
+    """Program Explorer tab; picking a program only reruns this tab"""
+    col1, col2 = st.columns([3, 1])
+    
+    with col1:
+        st.markdown(f'<div style="color: #6b7280; font-size: 0.875rem; margin-bottom: 1rem;">Showing {len(filtered_rows):,} offerings (est. ~{filtered_estimates["estimated_unique"]:,} unique programs)</div>', unsafe_allow_html=True)
+    
+    with col2:
+        with st.popover("Export Dataset", width="stretch"):
+            export_format = st.selectbox("Format", available_export_formats(), key="export_format")
+            export_options = [column for column in df.columns if column not in INTERNAL_COLUMNS]
+            export_columns = st.multiselect("Columns", export_options, default=export_options, key="export_columns")
+            extension, mime, _ = EXPORT_FORMATS[export_format]
+            # The file is only written when the button is clicked
+            st.download_button(
+                label="Download",
+                data=lambda: export_bytes(df, export_columns, export_format, filtered_rows),
+                file_name=f"credscout_export_{datetime.now().strftime('%Y%m%d')}.{extension}",
+                mime=mime,
+                disabled=not export_columns,
+                width="stretch"
             )
-            st.plotly_chart(fig_cred, use_container_width=True)
-        
-        st.markdown('<div class="section-subheader">Top Institutions by Volume</div>', unsafe_allow_html=True)
-        inst_counts = filtered_df['institution'].value_counts().head(15).reset_index()
-        inst_counts.columns = ['Institution', 'Offerings']
-        
-        fig_inst = px.bar(
-            inst_counts,
-            x='Offerings',
-            y='Institution',
-            orientation='h',
-            color='Offerings',
-            color_continuous_scale=[[0, '#dbeafe'], [1, '#3b82f6']]
+            if export_format == 'Excel' and len(filtered_rows) > EXCEL_MAX_ROWS:
+                st.caption(f"Excel holds the first {EXCEL_MAX_ROWS:,} rows; use CSV or Parquet for all of them")
+    
+    # Sorting and paging run on the server; only the visible page is sent
+    sort_col, order_col, size_col, page_col = st.columns([2, 1, 1, 1])
+    with sort_col:
+        sort_column = st.selectbox(
+            "Sort by",
+            [None] + list(EXPLORER_COLUMN_CONFIG),
+            format_func=lambda column: "Dataset order" if column is None else EXPLORER_COLUMN_CONFIG[column]['label'],
+            key="explorer_sort",
+            on_change=reset_explorer_page
         )
-        fig_inst.update_layout(
-            showlegend=False,
-            xaxis_title="Number of Offerings",
-            yaxis_title="",
-            margin=dict(l=20, r=20, t=20, b=20),
-            height=450,
-            paper_bgcolor='rgba(0,0,0,0)',
-            plot_bgcolor='rgba(0,0,0,0)',
-            font=dict(family='Inter', color='#374151'),
-            xaxis=dict(gridcolor='#f3f4f6'),
-            yaxis=dict(categoryorder='total ascending', gridcolor='#f3f4f6')
+    with order_col:
+        descending = st.selectbox(
+            "Order", [False, True],
+            format_func=lambda descending: "Descending" if descending else "Ascending",
+            key="explorer_descending",
+            on_change=reset_explorer_page,
+            disabled=sort_column is None
         )
-        st.plotly_chart(fig_inst, use_container_width=True)
-        
-        st.markdown('<div class="section-subheader">Price vs. Duration Analysis</div>', unsafe_allow_html=True)
-        scatter_df = filtered_df.dropna(subset=['price_cad', 'duration_weeks'])
-        if len(scatter_df) > 0:
-            fig_scatter = px.scatter(
-                scatter_df,
-                x='duration_weeks',
-                y='price_cad',
-                color='offering_level',
-                size='price_cad',
-                hover_data=['title', 'institution'],
-                color_discrete_sequence=['#3b82f6', '#8b5cf6', '#ec4899', '#f59e0b', '#10b981']
-            )
-            fig_scatter.update_layout(
-                xaxis_title="Duration (weeks)",
-                yaxis_title="Price (CAD)",
-                height=400,
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                font=dict(family='Inter', color='#374151'),
-                xaxis=dict(gridcolor='#f3f4f6'),
-                yaxis=dict(gridcolor='#f3f4f6'),
-                legend=dict(
-                    title="",
-                    orientation="h",
-                    yanchor="bottom",
-                    y=1.02,
-                    xanchor="right",
-                    x=1
-                )
-            )
-            st.plotly_chart(fig_scatter, use_container_width=True)
-        else:
-            st.info("Not enough data with both price and duration for scatter plot")
+    with size_col:
+        page_size = st.selectbox("Rows per page", EXPLORER_PAGE_SIZES, index=2, key="explorer_page_size", on_change=reset_explorer_page)
+    page_count = max(1, -(-len(filtered_rows) // page_size))
+    # A narrower selection can leave the remembered page past the end
+    if st.session_state.get('explorer_page', 1) > page_count:
+        st.session_state.explorer_page = page_count
+    with page_col:
+        page = st.number_input("Page", min_value=1, max_value=page_count, step=1, key="explorer_page")
+    
+    with timed('explorer_page'):
+        ordered_rows = sorted_selection(selection_cache, filter_state, sort_index, filtered_rows, sort_column, descending)
+        page_rows = ordered_rows[(page - 1) * page_size:page * page_size]
+        page_df = explorer_page(df, page_rows)
+    
+    st.dataframe(
+        page_df,
+        column_config=EXPLORER_COLUMN_CONFIG,
+        width="stretch",
+        height=450,
+        hide_index=True
+    )
+    st.caption(f"Page {page:,} of {page_count:,}")
     
-    with tab2:
-        # Extract and count skills
-        all_skills = []
-        for skills_str in filtered_df['skills'].dropna():
-            if skills_str != 'Unknown':
-                skills_list = [s.strip() for s in str(skills_str).split(',')]
-                all_skills.extend(skills_list)
+    st.markdown("<br>", unsafe_allow_html=True)
+    st.markdown('<div class="section-subheader">Program Details</div>', unsafe_allow_html=True)
+    
+    lookup_query = st.text_input(
+        "Find a program",
+        key="program_lookup",
+        placeholder="Find a filtered program by title...",
+        label_visibility="collapsed"
+    )
+    # Without a lookup query, details are picked from the visible page
+    if lookup_query:
+        program_ids = program_lookup.matches(lookup_query, rows=filtered_rows)
+    else:
+        program_ids = df['program_id'].to_numpy()[page_rows]
+    
+    if len(program_ids) > 0:
+        selected_id = st.selectbox(
+            "Select program",
+            options=program_ids.tolist(),
+            format_func=lambda program_id: program_option_label(df, program_lookup, program_id),
+            label_visibility="collapsed"
+        )
         
-        if all_skills:
-            skill_counts = Counter(all_skills)
-            top_skills_data = skill_counts.most_common(20)
+        if selected_id is not None:
+            program_row = program_lookup.row(selected_id)
+            program = df.iloc[program_row]
             
-            skills_df = pd.DataFrame(top_skills_data, columns=['Skill', 'Count'])
+            st.markdown(f"""
+            <div class="insight-card" style="padding: 2rem;">
+                <h3 style="color: #111827; margin-bottom: 0.5rem; font-size: 1.25rem; font-weight: 600;">{program['title']}</h3>
+                <div style="color: #6b7280; font-size: 0.875rem; margin-bottom: 1.5rem;">
+                    {program['institution']} • {program['credential_type'].title() if pd.notna(program['credential_type']) else 'Unknown'}
+                    <span class="badge-note">{program['offering_level'].replace('_', ' ').title()}</span>
+                </div>
+            </div>
+            """, unsafe_allow_html=True)
             
-            col1, col2 = st.columns([2, 1])
+            col1, col2, col3 = st.columns(3)
             
             with col1:
-                st.markdown('<div class="section-subheader">Top Skills in Market</div>', unsafe_allow_html=True)
-                fig_skills = px.bar(
-                    skills_df.head(15),
-                    x='Count',
-                    y='Skill',
-                    orientation='h',
-                    color='Count',
-                    color_continuous_scale=[[0, '#dbeafe'], [1, '#3b82f6']]
-                )
-                fig_skills.update_layout(
-                    showlegend=False,
-                    xaxis_title="Number of Programs",
-                    yaxis_title="",
-                    margin=dict(l=20, r=20, t=20, b=20),
-                    height=520,
-                    paper_bgcolor='rgba(0,0,0,0)',
-                    plot_bgcolor='rgba(0,0,0,0)',
-                    font=dict(family='Inter', color='#374151'),
-                    xaxis=dict(gridcolor='#f3f4f6'),
-                    yaxis=dict(categoryorder='total ascending', gridcolor='#f3f4f6')
-                )
-                st.plotly_chart(fig_skills, use_container_width=True)
+                st.markdown("**Delivery Mode**")
+                st.write(program['delivery_mode'] if pd.notna(program['delivery_mode']) else "Unknown")
+                st.markdown("**Duration**")
+                st.write(f"{program['duration_weeks']:.0f} weeks" if pd.notna(program['duration_weeks']) else program['duration_display'])
             
             with col2:
-                st.markdown('<div class="section-subheader">Market Leaders</div>', unsafe_allow_html=True)
-                
-                total_skill_mentions = sum(skill_counts.values())
-                top_5_skills = skills_df.head(5)
-                top_5_skills['Percentage'] = (top_5_skills['Count'] / total_skill_mentions * 100).round(1)
-                
-                for idx, row in top_5_skills.iterrows():
-                    st.markdown(f"""
-                    <div class="insight-card">
-                        <div style="font-weight: 600; color: #111827; margin-bottom: 0.375rem; font-size: 0.9375rem;">{row['Skill']}</div>
-                        <div style="color: #6b7280; font-size: 0.8125rem;">{row['Count']} mentions • {row['Percentage']}% of market</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-        else:
-            st.info("No skills data available for current filters")
+                st.markdown("**Price**")
+                if pd.notna(program['price_cad']):
+                    st.write(f"${program['price_cad']:,.0f} CAD")
+                else:
+                    st.write(program['price_display'] if pd.notna(program['price_display']) else "Unknown")
+                st.markdown("**Data Quality**")
+                st.write(program['data_quality'].title())
+            
+            with col3:
+                st.markdown("**Date Added**")
+                st.write(program['date_added'].strftime('%B %d, %Y') if pd.notna(program['date_added']) else "Unknown")
+                st.markdown("**Program Link**")
+                st.markdown(f"[Visit Program Page →]({program['program_url']})")
+            
+            st.markdown("---")
+            
+            if pd.notna(program['description']) and program['description'] != 'Unknown':
+                st.markdown("**Description**")
+                st.write(program['description'])
+            
+            if pd.notna(program['skills']) and program['skills'] != 'Unknown':
+                st.markdown("**Skills**")
+                skills_list = skill_table.row_skills(program_row)
+                skills_html = " ".join([f'<span style="background: #eff6ff; color: #1e40af; padding: 0.375rem 0.75rem; border-radius: 6px; font-size: 0.8125rem; margin-right: 0.5rem; margin-bottom: 0.5rem; display: inline-block; border: 1px solid #bfdbfe;">{skill}</span>' for skill in skills_list])
+                st.markdown(skills_html, unsafe_allow_html=True)
+    elif lookup_query:
+        st.info(f'No programs matching your current filters have "{lookup_query}" in the title')
+    else:
+        st.info("No programs match your current filters")
+
+@st.fragment
+def competitive_tab(selection_cache, filter_state, filter_engine, df, filtered_rows):
+    """Competitive Analysis tab, rerun on its own"""
+    competitive = cached_tab_content(
+        selection_cache, filter_state, 'competitive',
+        lambda: competitive_content(filter_engine, filtered_rows, df.iloc[filtered_rows])
+    )
+    st.markdown('<div class="section-subheader">Top Institutions by Volume</div>', unsafe_allow_html=True)
+    
+    st.dataframe(
+        competitive['institutions'],
+        width="stretch",
+        hide_index=True,
+        height=380
+    )
+    
+    st.markdown('<div class="section-subheader">Price Distribution by Offering Level</div>', unsafe_allow_html=True)
+    
+    if competitive['box'] is not None:
+        render_chart(competitive['box'])
+        if competitive['box_note']:
+            st.caption(competitive['box_note'])
+    else:
+        st.info("Insufficient price data for distribution analysis")
+
+@st.fragment
+def results_view(
+    df, search_index, skill_table, filter_engine, sort_index, program_lookup, selection_cache,
+    top_skills, selected_values, price_range, duration_range
+):
+    """Search box, metrics and tabs; a search change reruns only this fragment"""
+    search_term = render_search_bar(top_skills)
+    
+    # Resolve search, selects and ranges to one row selection
+    filter_state = normalize_filter_state(search_term, selected_values, price_range, duration_range)
+    filtered_rows, filtered_estimates = select_filtered(filter_engine, search_index, selection_cache, filter_state)
+    full_estimates = select_filtered(filter_engine, search_index, selection_cache, ALL_ROWS_STATE)[1]
+    # Sessions keep only the selection's row positions into the shared frame; tabs build
+    # a frame of the selected rows while computing their content, and drop it after
+    render_metrics(search_term, df, filtered_rows, filtered_estimates, full_estimates)
+    
+    # Tabs; only the open tab is computed, and its content is cached per filter state
+    tab1, tab2, tab3, tab4 = st.tabs(
+        ["Market Overview", "Skills Intelligence", "Program Explorer", "Competitive Analysis"],
+        key="active_tab",
+        on_change="rerun"
+    )
+    
+    with tab1:
+        if tab1.open:
+            overview_tab(selection_cache, filter_state, df, filtered_rows)
+    
+    with tab2:
+        if tab2.open:
+            skills_tab(selection_cache, filter_state, skill_table, filtered_rows)
     
     with tab3:
-        col1, col2 = st.columns([3, 1])
-        
-        with col1:
-            st.markdown(f'<div style="color: #6b7280; font-size: 0.875rem; margin-bottom: 1rem;">Showing {len(filtered_df):,} offerings (est. ~{filtered_estimates["estimated_unique"]:,} unique programs)</div>', unsafe_allow_html=True)
-        
-        with col2:
-            csv = filtered_df.to_csv(index=False).encode('utf-8')
-            st.download_button(
-                label="Export Dataset",
-                data=csv,
-                file_name=f"credscout_export_{datetime.now().strftime('%Y%m%d')}.csv",
-                mime="text/csv",
-                use_container_width=True
-            )
-        
-        # Format table
-        display_df = filtered_df[[
-            'title', 'institution', 'credential_type', 'offering_level',
-            'delivery_mode', 'duration_weeks', 'price_cad', 'data_quality'
-        ]].copy()
-        
-        display_df.columns = [
-            'Program', 'Institution', 'Type', 'Level',
-            'Delivery', 'Duration', 'Price', 'Quality'
-        ]
-        
-        display_df['Price'] = display_df['Price'].apply(lambda x: f"${x:,.0f}" if pd.notna(x) else "Unknown")
-        display_df['Duration'] = display_df['Duration'].apply(lambda x: f"{x:.0f}w" if pd.notna(x) else "Unknown")
-        display_df['Quality'] = display_df['Quality'].apply(lambda x: x.title() if pd.notna(x) else "Unknown")
-        
-        st.dataframe(
-            display_df,
-            use_container_width=True,
-            height=450,
-            hide_index=True
-        )
-        
-        st.markdown("<br>", unsafe_allow_html=True)
-        st.markdown('<div class="section-subheader">Program Details</div>', unsafe_allow_html=True)
-        
-        if len(filtered_df) > 0:
-            selected_program = st.selectbox(
-                "Select program",
-                options=filtered_df['title'].tolist(),
-                label_visibility="collapsed"
+        if tab3.open:
+            explorer_tab(
+                selection_cache, filter_state, df, skill_table, sort_index, program_lookup,
+                filtered_rows, filtered_estimates
             )
-            
-            if selected_program:
-                program = filtered_df[filtered_df['title'] == selected_program].iloc[0]
-                
-                st.markdown(f"""
-                <div class="insight-card" style="padding: 2rem;">
-                    <h3 style="color: #111827; margin-bottom: 0.5rem; font-size: 1.25rem; font-weight: 600;">{program['title']}</h3>
-                    <div style="color: #6b7280; font-size: 0.875rem; margin-bottom: 1.5rem;">
-                        {program['institution']} • {program['credential_type'].title()}
-                        <span class="badge-note">{program['offering_level'].replace('_', ' ').title()}</span>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
-                
-                col1, col2, col3 = st.columns(3)
-                
-                with col1:
-                    st.markdown("**Delivery Mode**")
-                    st.write(program['delivery_mode'] if pd.notna(program['delivery_mode']) else "Unknown")
-                    st.markdown("**Duration**")
-                    st.write(f"{program['duration_weeks']:.0f} weeks" if pd.notna(program['duration_weeks']) else program['duration_display'])
-                
-                with col2:
-                    st.markdown("**Price**")
-                    if pd.notna(program['price_cad']):
-                        st.write(f"${program['price_cad']:,.0f} CAD")
-                    else:
-                        st.write(program['price_display'] if pd.notna(program['price_display']) else "Unknown")
-                    st.markdown("**Data Quality**")
-                    st.write(program['data_quality'].title())
-                
-                with col3:
-                    st.markdown("**Date Added**")
-                    st.write(program['date_added'].strftime('%B %d, %Y') if pd.notna(program['date_added']) else "Unknown")
-                    st.markdown("**Program Link**")
-                    st.markdown(f"[Visit Program Page →]({program['program_url']})")
-                
-                st.markdown("---")
-                
-                if pd.notna(program['description']) and program['description'] != 'Unknown':
-                    st.markdown("**Description**")
-                    st.write(program['description'])
-                
-                if pd.notna(program['skills']) and program['skills'] != 'Unknown':
-                    st.markdown("**Skills**")
-                    skills_list = [s.strip() for s in str(program['skills']).split(',')]
-                    skills_html = " ".join([f'<span style="background: #eff6ff; color: #1e40af; padding: 0.375rem 0.75rem; border-radius: 6px; font-size: 0.8125rem; margin-right: 0.5rem; margin-bottom: 0.5rem; display: inline-block; border: 1px solid #bfdbfe;">{skill}</span>' for skill in skills_list])
-                    st.markdown(skills_html, unsafe_allow_html=True)
-        else:
-            st.info("No programs match your current filters")
     
     with tab4:
-        st.markdown('<div class="section-subheader">Top Institutions by Volume</div>', unsafe_allow_html=True)
-        
-        institution_stats = filtered_df.groupby('institution').agg({
-            'program_id': 'count',
-            'price_cad': 'mean',
-            'duration_weeks': 'mean'
-        }).round(0).reset_index()
-        
-        institution_stats.columns = ['Institution', 'Offerings', 'Avg Price', 'Avg Duration']
-        institution_stats = institution_stats.sort_values('Offerings', ascending=False).head(10)
-        institution_stats['Avg Price'] = institution_stats['Avg Price'].apply(lambda x: f"${x:,.0f}" if pd.notna(x) else "N/A")
-        institution_stats['Avg Duration'] = institution_stats['Avg Duration'].apply(lambda x: f"{x:.0f}w" if pd.notna(x) else "N/A")
-        
-        st.dataframe(
-            institution_stats,
-            use_container_width=True,
-            hide_index=True,
-            height=380
-        )
-        
-        st.markdown('<div class="section-subheader">Price Distribution by Offering Level</div>', unsafe_allow_html=True)
-        
-        price_df = filtered_df.dropna(subset=['price_cad', 'offering_level'])
-        if len(price_df) > 0:
-            fig_box = px.box(
-                price_df,
-                x='offering_level',
-                y='price_cad',
-                color='offering_level',
-                color_discrete_sequence=['#3b82f6', '#8b5cf6', '#ec4899', '#f59e0b', '#10b981']
-            )
-            fig_box.update_layout(
-                showlegend=False,
-                xaxis_title="",
-                yaxis_title="Price (CAD)",
-                height=380,
-                paper_bgcolor='rgba(0,0,0,0)',
-                plot_bgcolor='rgba(0,0,0,0)',
-                font=dict(family='Inter', color='#374151'),
-                xaxis=dict(gridcolor='#f3f4f6'),
-                yaxis=dict(gridcolor='#f3f4f6')
-            )
-            st.plotly_chart(fig_box, use_container_width=True)
-        else:
-            st.info("Insufficient price data for distribution analysis")
+        if tab4.open:
+            competitive_tab(selection_cache, filter_state, filter_engine, df, filtered_rows)
+
+# Header
+st.markdown("""
+<div class="credscout-header">
+    <div>
+        <div class="credscout-logo"><span class="credscout-logo-accent">Cred</span>Scout Intelligence</div>
+        <div class="credscout-tagline">The Intelligence Layer for Continuing Education</div>
+    </div>
+</div>
+""", unsafe_allow_html=True)
+
+# File uploader
+uploaded_file = st.file_uploader(
+    "Upload Processed Dataset",
+    type=['csv'],
+    help="Use the preprocessed CSV file from preprocess_cpe_data.py",
+    label_visibility="collapsed"
+)
+
+if uploaded_file is not None:
+    # Load data
+    with timed('load_data'):
+        dataset_key = upload_dataset_key(uploaded_file)
+        df, quality_profile = load_dataset(uploaded_file, dataset_key)
+    with timed('build_indexes'):
+        search_index = build_search_index(df, dataset_key)
+        skill_table = build_skill_table(df, dataset_key)
+        filter_engine = build_filter_engine(df, dataset_key)
+        sort_index = build_sort_index(df, dataset_key)
+        program_lookup = build_program_lookup(df, dataset_key)
+        selection_cache = build_selection_cache(df, dataset_key)
+    
+    # Extract top skills for quick search
+    with timed('top_skills'):
+        top_skills = extract_top_skills(skill_table, top_n=20)
+    
+    # Sidebar filters are batched in a form; search, metrics and tabs rerun as a fragment
+    selected_values, price_range, duration_range = render_filter_sidebar(filter_engine, quality_profile)
+    results_view(
+        df, search_index, skill_table, filter_engine, sort_index, program_lookup, selection_cache,
+        top_skills, selected_values, price_range, duration_range
+    )
+    render_diagnostics()
 
 else:
     st.markdown("""
@@ -0,0 +1,517 @@
+"""Cleaning pipeline for raw CPE scrapes, shared by the dashboard and the preprocessing CLI"""
+import pandas as pd
+import numpy as np
+import pyarrow as pa
+import pyarrow.compute as pc
+import re
+import os
+import json
+import logging
+import io
+import multiprocessing
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+# Bump whenever the cleaning logic changes so stale processed frames are not reused
+PIPELINE_VERSION = 3
+# Worker processes for raw ingestion; 1 runs everything in-process
+INGEST_WORKERS = int(os.environ.get('CREDSCOUT_INGEST_WORKERS', os.cpu_count() or 1))
+# Start method of ingestion workers; forking a process that already runs threads (Arrow's
+# pools, a web server) can deadlock a child on a lock held at fork time
+INGEST_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+# Target size of one byte-range shard of the raw CSV
+SHARD_BYTES = 32 * 2**20
+# Smaller inputs are cleaned in-process; pool start-up would cost more than it saves
+PARALLEL_MIN_BYTES = 8 * 2**20
+# Columns of the headerless raw scrape, in file order
+RAW_COLUMNS = [
+    'institution', 'program_name', 'credential_type', 'delivery_mode',
+    'duration', 'skills', 'price', 'description', 'url', 'scraped_date'
+]
+# A program is identified by where it was scraped from and what it is called
+PROGRAM_KEY_COLUMNS = ['url', 'institution', 'program_name']
+# Fixed SipHash key so program keys and row hashes are the same across runs
+ROW_HASH_KEY = '0123456789123456'
+
+def clean_price(price_str):
+    """Extract numeric price from various formats"""
+    if pd.isna(price_str) or price_str == 'Unknown':
+        return None
+    clean = str(price_str).replace('$', '').replace(',', '').replace(' ', '').replace('CAD', '').replace('cad', '')
+    try:
+        return float(clean)
+    except:
+        return None
+
+# Tokens stripped from price strings, in the same order as clean_price
+PRICE_STRIP_TOKENS = ['$', ',', ' ', 'CAD', 'cad']
+PLAIN_NUMBER_PATTERN = r'-?(?:\d+\.?\d*|\.\d+)'
+PRICE_RANGE_PATTERN = re.compile(
+    rf'(?:from)?({PLAIN_NUMBER_PATTERN})(?:-|–|—|to)({PLAIN_NUMBER_PATTERN})\+?'
+)
+PRICE_FROM_PATTERN = re.compile(rf'(?:from|startingat|startsat)({PLAIN_NUMBER_PATTERN})\+?')
+
+def parse_price_text(clean):
+    """Parse an already-stripped price string, including ranges and 'from $X' prices"""
+    try:
+        return float(clean)
+    except ValueError:
+        pass
+    clean = clean.lower()
+    match = PRICE_RANGE_PATTERN.fullmatch(clean)
+    if match:
+        # Ranges are reported at their lower bound, like 'from $X' prices
+        return min(float(match.group(1)), float(match.group(2)))
+    match = PRICE_FROM_PATTERN.fullmatch(clean)
+    if match:
+        return float(match.group(1))
+    return None
+
+def map_distinct_values(series, parse_values):
+    """Run a column parser once per distinct non-null value and broadcast back to the rows"""
+    codes, uniques = pd.factorize(series)
+    parsed = parse_values(pd.Series(uniques))
+    values = np.append(parsed, np.nan)[codes]
+    return pd.Series(values, index=series.index, name=series.name)
+
+def parse_price_values(prices):
+    """Parse a column of distinct, non-null price values into a float array"""
+    parsed = np.full(len(prices), np.nan)
+    present = (prices != 'Unknown').to_numpy(dtype=bool)
+    text = prices[present].astype(str)
+    for token in PRICE_STRIP_TOKENS:
+        text = text.str.replace(token, '', regex=False)
+
+    # Plain numbers go through one cast; anything else falls back to parse_price_text
+    numbers = np.full(len(text), np.nan)
+    plain = text.str.fullmatch(PLAIN_NUMBER_PATTERN).to_numpy(dtype=bool)
+    numbers[plain] = text[plain].astype('float64').to_numpy()
+    if not plain.all():
+        numbers[~plain] = text[~plain].map(parse_price_text).to_numpy(dtype=float)
+    parsed[present] = numbers
+    return parsed
+
+def parse_price_series(prices):
+    """Vectorized clean_price over a whole column"""
+    if pd.api.types.is_float_dtype(prices) or pd.api.types.is_integer_dtype(prices):
+        return prices.astype('float64')
+
+    return map_distinct_values(prices, parse_price_values)
+
+def clean_duration(duration_str):
+    """Convert duration to weeks"""
+    if pd.isna(duration_str) or duration_str == 'Unknown':
+        return None
+    duration_str = str(duration_str).lower()
+    numbers = re.findall(r'\d+\.?\d*', duration_str)
+    if not numbers:
+        return None
+    num = float(numbers[0])
+    if 'month' in duration_str:
+        return num * 4
+    elif 'week' in duration_str:
+        return num
+    elif 'day' in duration_str:
+        return num / 7
+    elif 'hour' in duration_str:
+        return num / 40
+    elif 'year' in duration_str:
+        return num * 52
+    return None
+
+# Weeks per duration unit as (multiplier, divisor), in clean_duration's priority order.
+# Kept as a fraction so results match clean_duration bit for bit.
+DURATION_UNIT_WEEKS = [
+    ('month', 4, 1),
+    ('week', 1, 1),
+    ('day', 1, 7),
+    ('hour', 1, 40),
+    ('year', 52, 1),
+]
+
+def normalize_duration_values(durations):
+    """Convert a column of distinct, non-null durations to weeks"""
+    weeks = np.full(len(durations), np.nan)
+    present = (durations != 'Unknown').to_numpy(dtype=bool)
+    text = durations[present].astype(str).str.lower()
+
+    numbers = text.str.extract(r'(\d+\.?\d*)', expand=False).astype('float64').to_numpy()
+    has_unit = [text.str.contains(unit, regex=False).to_numpy(dtype=bool) for unit, _, _ in DURATION_UNIT_WEEKS]
+    multiplier = np.select(has_unit, [m for _, m, _ in DURATION_UNIT_WEEKS], default=np.nan)
+    divisor = np.select(has_unit, [d for _, _, d in DURATION_UNIT_WEEKS], default=1)
+    weeks[present] = numbers * multiplier / divisor
+    return weeks
+
+def normalize_duration_series(durations):
+    """Vectorized clean_duration over a whole column"""
+    return map_distinct_values(durations, normalize_duration_values)
+
+def categorize_offering_level(row):
+    """Categorize offering into levels"""
+    cred_type = str(row.get('credential_type', '')).lower()
+    price = row.get('price_cad')
+    duration = row.get('duration_weeks')
+    if (price and price < 500) or (duration and duration < 2):
+        return 'micro_learning'
+    if (price and price > 5000) or (duration and duration > 24):
+        return 'diploma'
+    if 'course' in cred_type and price and price < 1000:
+        return 'course'
+    if 'certificate' in cred_type or 'credential' in cred_type:
+        if price and price > 2000:
+            return 'certificate_advanced'
+        return 'certificate'
+    if 'professional' in cred_type or 'statement' in cred_type:
+        return 'professional_development'
+    return 'certificate'
+
+# Offering-level rules, checked top to bottom like categorize_offering_level.
+# Numeric conditions only hold for present, non-zero values; 'contains' matches
+# any of its keywords in the lowercased column text.
+OFFERING_LEVEL_RULES = [
+    {'level': 'micro_learning', 'match': 'any', 'conditions': [['price_cad', '<', 500], ['duration_weeks', '<', 2]]},
+    {'level': 'diploma', 'match': 'any', 'conditions': [['price_cad', '>', 5000], ['duration_weeks', '>', 24]]},
+    {'level': 'course', 'match': 'all', 'conditions': [['credential_type', 'contains', ['course']], ['price_cad', '<', 1000]]},
+    {'level': 'certificate_advanced', 'match': 'all', 'conditions': [['credential_type', 'contains', ['certificate', 'credential']], ['price_cad', '>', 2000]]},
+    {'level': 'certificate', 'match': 'all', 'conditions': [['credential_type', 'contains', ['certificate', 'credential']]]},
+    {'level': 'professional_development', 'match': 'all', 'conditions': [['credential_type', 'contains', ['professional', 'statement']]]},
+]
+DEFAULT_OFFERING_LEVEL = 'certificate'
+
+RULE_OPERATORS = {
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+}
+
+def load_offering_level_rules(path=None):
+    """Load offering-level rules from a JSON file, falling back to the built-in table"""
+    path = path or os.environ.get('CREDSCOUT_OFFERING_RULES')
+    if not path:
+        return OFFERING_LEVEL_RULES, DEFAULT_OFFERING_LEVEL
+    with open(path) as f:
+        config = json.load(f)
+    return config.get('rules', OFFERING_LEVEL_RULES), config.get('default_level', DEFAULT_OFFERING_LEVEL)
+
+def rule_condition_mask(df, column, op, value):
+    """Evaluate one rule condition over whole columns"""
+    if op == 'contains':
+        keywords = [value] if isinstance(value, str) else value
+        if column not in df:
+            return np.zeros(len(df), dtype=bool)
+        # Match keywords once per distinct value, as str(value).lower() like the row classifier
+        codes, uniques = pd.factorize(df[column], use_na_sentinel=False)
+        texts = [str(v).lower() for v in uniques]
+        matches = np.array([any(k in text for k in keywords) for text in texts], dtype=bool)
+        return matches[codes]
+    if op not in RULE_OPERATORS:
+        raise ValueError(f"Unknown offering-level rule operator: {op}")
+    if column not in df:
+        return np.zeros(len(df), dtype=bool)
+    values = df[column].to_numpy(dtype='float64', na_value=np.nan)
+    return (values != 0) & RULE_OPERATORS[op](values, value)
+
+def compile_offering_level_rules(rules, default_level=DEFAULT_OFFERING_LEVEL):
+    """Compile a rule table into a function that classifies a whole frame at once"""
+    def classify(df):
+        masks = []
+        for rule in rules:
+            condition_masks = [rule_condition_mask(df, *condition) for condition in rule['conditions']]
+            combine = np.logical_or if rule.get('match', 'all') == 'any' else np.logical_and
+            masks.append(combine.reduce(condition_masks) if condition_masks else np.ones(len(df), dtype=bool))
+        levels = np.select(masks, [rule['level'] for rule in rules], default=default_level)
+        return pd.Series(levels.astype(object), index=df.index, name='offering_level')
+    return classify
+
+OFFERING_LEVEL_CONFIG = load_offering_level_rules()
+classify_offering_levels = compile_offering_level_rules(*OFFERING_LEVEL_CONFIG)
+
+# Fields that count towards a row's data quality
+QUALITY_COLUMNS = ['credential_type', 'delivery_mode', 'duration', 'skills', 'price', 'description']
+
+def assess_data_quality(df):
+    """Score rows good/moderate/poor by missing fields and profile per-column completeness"""
+    # One missing-or-Unknown-or-empty matrix; absent columns count as missing on every row
+    missing = np.column_stack([
+        (df[col].isna() | df[col].isin(['Unknown', ''])).to_numpy(dtype=bool) if col in df
+        else np.ones(len(df), dtype=bool)
+        for col in QUALITY_COLUMNS
+    ])
+    unknown_count = missing.sum(axis=1)
+    quality = np.select([unknown_count >= 4, unknown_count >= 2], ['poor', 'moderate'], default='good')
+
+    profile = build_quality_profile(missing.sum(axis=0), len(df))
+    return pd.Series(quality.astype(object), index=df.index, name='data_quality'), profile
+
+def build_quality_profile(missing_per_column, rows):
+    """Per-column missing counts and completeness over a given number of rows
+
+    With no rows there is nothing to be complete, so completeness is NaN rather than 100%.
+    """
+    missing_per_column = np.asarray(missing_per_column, dtype='int64')
+    return pd.DataFrame({
+        'missing': missing_per_column,
+        'completeness': 1 - missing_per_column / rows if rows else np.nan,
+    }, index=QUALITY_COLUMNS)
+
+# Processed-frame schema: low-cardinality labels as categoricals, downcast numbers,
+# and Arrow-backed strings for free text
+CATEGORICAL_COLUMNS = ['institution', 'credential_type', 'delivery_mode', 'offering_level', 'data_quality', 'province']
+DOWNCAST_COLUMNS = {'price_cad': 'float32', 'duration_weeks': 'float32', 'program_id': 'int32'}
+TEXT_COLUMNS = [
+    'title', 'program_name', 'description', 'skills', 'url', 'program_url',
+    'price', 'price_display', 'duration', 'duration_display', 'scraped_date'
+]
+
+def apply_compact_schema(df):
+    """Convert a processed frame to its compact dtypes, logging the memory saved"""
+    before = df.memory_usage(deep=True) if logger.isEnabledFor(logging.INFO) else None
+    dtypes = {}
+    for column in CATEGORICAL_COLUMNS:
+        if column in df:
+            dtypes[column] = 'category'
+    for column, dtype in DOWNCAST_COLUMNS.items():
+        if column in df and not (dtype.startswith('int') and df[column].isna().any()):
+            dtypes[column] = dtype
+    for column in TEXT_COLUMNS:
+        # Columns pandas already stores in Arrow are left as they are
+        if column in df and df[column].dtype == object:
+            dtypes[column] = 'string[pyarrow]'
+    df = df.astype(dtypes)
+
+    if before is not None:
+        report = memory_report(before, df.memory_usage(deep=True))
+        logger.info(
+            "Processed frame memory: %.1f MB -> %.1f MB",
+            report['before'].sum() / 1e6, report['after'].sum() / 1e6
+        )
+    return df
+
+def memory_report(before, after):
+    """Per-column memory (bytes) before and after, from two memory_usage(deep=True) results"""
+    report = pd.DataFrame({'before': before, 'after': after}).fillna(0).astype('int64')
+    report['saved'] = report['before'] - report['after']
+    return report
+
+def read_raw_csv(source, **kwargs):
+    """Read a headerless raw scrape, keeping every field as text"""
+    return pd.read_csv(source, header=None, names=RAW_COLUMNS, dtype=str, **kwargs)
+
+def hash_text_columns(df, columns):
+    """Stable 64-bit hash of each row's text across the given columns"""
+    separator = pa.scalar('\x1f', type=pa.large_string())
+    joined = pc.binary_join_element_wise(
+        *[pa.array(df[column], type=pa.large_string(), from_pandas=True) for column in columns],
+        separator, null_handling='replace', null_replacement='\x00'
+    )
+    return pd.util.hash_array(joined.to_numpy(zero_copy_only=False), hash_key=ROW_HASH_KEY, categorize=False)
+
+def add_row_identity(df):
+    """Add program_key (stable ID from url, institution and title) and row_hash (raw content)"""
+    df['program_key'] = hash_text_columns(df, PROGRAM_KEY_COLUMNS)
+    df['row_hash'] = hash_text_columns(df, RAW_COLUMNS)
+    return df
+
+def process_raw_frame(df, start_id=1):
+    """Clean a raw scrape frame, numbering programs from start_id; returns (df, quality profile)"""
+    add_row_identity(df)
+
+    # Rename to expected format
+    df['title'] = df['program_name']
+    df['program_url'] = df['url']
+    df['program_id'] = range(start_id, start_id + len(df))
+    df['province'] = 'Unknown'
+
+    # Clean prices
+    df['price_cad'] = parse_price_series(df['price'])
+    df['price_display'] = df['price']
+
+    # Clean durations
+    df['duration_weeks'] = normalize_duration_series(df['duration'])
+    df['duration_display'] = df['duration']
+
+    # Categorize offering levels
+    df['offering_level'] = classify_offering_levels(df)
+
+    # Add data quality
+    df['data_quality'], quality_profile = assess_data_quality(df)
+    df['date_added'] = pd.to_datetime(df['scraped_date'], errors='coerce')
+
+    return df, quality_profile
+
+def count_quotes(data, start, end, block_bytes=16 * 2**20):
+    """Number of double-quote bytes in data[start:end]"""
+    return sum(
+        int(np.count_nonzero(data[pos:min(pos + block_bytes, end)] == ord('"')))
+        for pos in range(start, end, block_bytes)
+    )
+
+def next_record_start(data, position, quotes, block_bytes=1 << 16):
+    """First record start after position, given the quote count before it
+
+    A newline only ends a record when it sits outside a quoted field, i.e. after an
+    even number of quotes. Returns (record start, quotes before it).
+    """
+    size = len(data)
+    while position < size:
+        block = np.asarray(data[position:position + block_bytes])
+        quote_positions = np.flatnonzero(block == ord('"'))
+        newlines = np.flatnonzero(block == ord('\n'))
+        preceding = np.searchsorted(quote_positions, newlines)
+        ends = np.flatnonzero((quotes + preceding) % 2 == 0)
+        if len(ends):
+            return position + newlines[ends[0]] + 1, quotes + int(preceding[ends[0]])
+        quotes += len(quote_positions)
+        position += len(block)
+    return size, quotes
+
+def record_offsets(data, block_bytes=16 * 2**20):
+    """Start offset of every CSV record in data, followed by len(data)"""
+    offsets = [np.zeros(1, dtype=np.int64)]
+    quotes = 0
+    for position in range(0, len(data), block_bytes):
+        block = np.asarray(data[position:position + block_bytes])
+        quote_positions = np.flatnonzero(block == ord('"'))
+        newlines = np.flatnonzero(block == ord('\n'))
+        # A newline ends a record when an even number of quotes precede it
+        outside = (quotes + np.searchsorted(quote_positions, newlines)) % 2 == 0
+        offsets.append(newlines[outside] + position + 1)
+        quotes += len(quote_positions)
+    offsets = np.concatenate(offsets)
+    if offsets[-1] != len(data):
+        offsets = np.append(offsets, len(data))
+    return offsets
+
+def shard_offsets(data, shard_count):
+    """Split raw CSV bytes into at most shard_count record-aligned byte ranges"""
+    size = len(data)
+    offsets = [0]
+    position = quotes = 0
+    for shard in range(1, shard_count):
+        target = size * shard // shard_count
+        if target <= position:
+            continue
+        quotes += count_quotes(data, position, target)
+        position, quotes = next_record_start(data, target, quotes)
+        if position >= size:
+            break
+        offsets.append(position)
+    offsets.append(size)
+    return list(zip(offsets[:-1], offsets[1:]))
+
+def clean_raw_shard(shard):
+    """Clean one shard of raw CSV, given as bytes or a (path, start, end) byte range"""
+    if not isinstance(shard, bytes):
+        path, start, end = shard
+        with open(path, 'rb') as f:
+            f.seek(start)
+            shard = f.read(end - start)
+    try:
+        df = read_raw_csv(io.BytesIO(shard))
+    except pd.errors.EmptyDataError:
+        df = pd.DataFrame(columns=RAW_COLUMNS, dtype=object)
+    return process_raw_frame(df)
+
+def renumber_programs(df, start_id):
+    """Shift a shard's 1-based program_ids so they continue from start_id"""
+    df['program_id'] = range(start_id, start_id + len(df))
+    return df
+
+def map_shards_in_order(shards, workers):
+    """Clean shards in a process pool, yielding results in input order
+
+    At most two shards per worker are in flight, so memory stays bounded by the
+    shard size rather than the input size.
+    """
+    context = multiprocessing.get_context(INGEST_START_METHOD)
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        pending = deque()
+        for shard in shards:
+            pending.append(pool.submit(clean_raw_shard, shard))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def iter_processed_chunks(path, chunk_size, workers=INGEST_WORKERS, shard_bytes=SHARD_BYTES):
+    """Clean a raw CSV file piece by piece, yielding (df, quality profile) with global program_ids
+
+    With one worker the file is read in chunk_size-row chunks; otherwise it is split
+    into record-aligned byte ranges of about shard_bytes cleaned across a process pool.
+    Both modes produce the same rows and ids.
+    """
+    size = os.path.getsize(path)
+    if workers <= 1 or size < PARALLEL_MIN_BYTES:
+        pieces = (process_raw_frame(chunk) for chunk in read_raw_csv(path, chunksize=chunk_size))
+    else:
+        data = np.memmap(path, dtype=np.uint8, mode='r')
+        ranges = shard_offsets(data, max(workers, -(-size // shard_bytes)))
+        del data
+        pieces = map_shards_in_order([(path, start, end) for start, end in ranges], workers)
+
+    rows = 0
+    for df, quality_profile in pieces:
+        yield renumber_programs(df, rows + 1), quality_profile
+        rows += len(df)
+
+def process_raw_bytes(data, workers=INGEST_WORKERS):
+    """Clean a whole raw CSV held in memory, in parallel when it is large enough"""
+    if workers <= 1 or len(data) < PARALLEL_MIN_BYTES:
+        return process_raw_frame(read_raw_csv(io.BytesIO(data)))
+
+    view = np.frombuffer(data, dtype=np.uint8)
+    shards = [data[start:end] for start, end in shard_offsets(view, workers)]
+    frames, profiles = zip(*map_shards_in_order(shards, workers))
+    df = pd.concat(frames, ignore_index=True)
+    renumber_programs(df, 1)
+    missing = sum(profile['missing'].to_numpy() for profile in profiles)
+    return df, build_quality_profile(missing, len(df))
+
+def incremental_changes(old_keys, old_hashes, keys, hashes):
+    """Positions of changed rows when keys extends old_keys in order, else None
+
+    Incremental merges keep existing rows in place and append new ones, so a frame
+    built that way starts with the previous frame's keys.
+    """
+    size = len(old_keys)
+    if len(keys) < size or not np.array_equal(keys[:size], old_keys):
+        return None
+    return np.flatnonzero(hashes[:size] != old_hashes)
+
+def latest_batch_rows(chunks):
+    """The last raw row of each program_key across a batch read in chunks, with its row identity
+
+    Deduplicating over the whole batch before any diff means a key repeated across
+    chunks resolves to the same row whatever the chunk size.
+    """
+    latest = None
+    for chunk in chunks:
+        chunk = add_row_identity(chunk).drop_duplicates('program_key', keep='last')
+        if latest is not None:
+            chunk = pd.concat([latest, chunk], ignore_index=True).drop_duplicates('program_key', keep='last')
+        latest = chunk
+    if latest is None:
+        latest = add_row_identity(pd.DataFrame(columns=RAW_COLUMNS, dtype=object))
+    return latest
+
+def plan_incremental(store_keys, store_hashes, batch):
+    """Split a raw batch into rows that change existing programs and brand-new programs
+
+    batch holds one row per program_key with its row identity, as from latest_batch_rows.
+    Returns (changed, positions, added): batch rows whose content differs from the
+    stored program at store position positions[i], and batch rows for unseen keys.
+    Unchanged rows are dropped.
+    """
+    # Last stored position per key, matching how the batch is deduplicated
+    store_positions = pd.Series(np.arange(len(store_keys)), index=store_keys)
+    store_positions = store_positions[~store_positions.index.duplicated(keep='last')]
+    positions = store_positions.reindex(batch['program_key'].to_numpy()).to_numpy()
+
+    known = ~np.isnan(positions)
+    known_positions = positions[known].astype(np.int64)
+    changed_mask = batch['row_hash'].to_numpy()[known] != np.asarray(store_hashes)[known_positions]
+    changed = batch[known][changed_mask]
+    return changed, known_positions[changed_mask], batch[~known]
@@ -0,0 +1,225 @@
+"""Generate a synthetic raw CPE scrape (headerless, 10-column schema) for testing and benchmarks"""
+import argparse
+import sys
+import time
+import numpy as np
+import pandas as pd
+from credscout_pipeline import RAW_COLUMNS
+
+# Named dataset sizes; any other size can be given as a row count
+DATASET_SIZES = {'10k': 10_000, '100k': 100_000, '1m': 1_000_000, '5m': 5_000_000}
+DEFAULT_CHUNK_ROWS = 200_000
+
+INSTITUTIONS = [
+    ('University of Toronto School of Continuing Studies', 'learn.utoronto.ca'),
+    ('The Chang School, Toronto Metropolitan University', 'continuing.torontomu.ca'),
+    ('McGill School of Continuing Studies', 'mcgill.ca/continuingstudies'),
+    ('UBC Extended Learning', 'extendedlearning.ubc.ca'),
+    ('SFU Continuing Studies', 'sfu.ca/continuing-studies'),
+    ('York University School of Continuing Studies', 'continue.yorku.ca'),
+    ('Concordia Continuing Education', 'concordia.ca/cce'),
+    ('University of Calgary Continuing Education', 'conted.ucalgary.ca'),
+    ('Dalhousie Continuing Education', 'dal.ca/faculty/cce'),
+    ('Université Laval - Formation continue', 'ulaval.ca/formation-continue'),
+    ('Humber College', 'humber.ca/continuous-professional-learning'),
+    ('Seneca Polytechnic', 'senecapolytechnic.ca/ce'),
+    ('George Brown College', 'coned.georgebrown.ca'),
+    ('Algonquin College', 'algonquincollege.com/coned'),
+    ('Conestoga College', 'conestogac.on.ca/part-time'),
+    ('Mohawk College', 'mohawkcollege.ca/ce'),
+    ('BCIT', 'bcit.ca/part-time-studies'),
+    ('SAIT', 'sait.ca/continuing-education'),
+    ('NAIT', 'nait.ca/continuing-education'),
+    ('Red River College Polytechnic', 'rrc.ca/cde'),
+]
+TOPICS = [
+    'Data Analytics', 'Data Science', 'Machine Learning', 'Artificial Intelligence', 'Python Programming',
+    'Cloud Computing', 'Cybersecurity', 'Project Management', 'Agile Project Management', 'Business Analysis',
+    'Digital Marketing', 'Human Resources Management', 'Leadership', 'Change Management', 'Supply Chain Management',
+    'Accounting', 'Financial Planning', 'Health Informatics', 'Mental Health First Aid', 'Occupational Health and Safety',
+    'UX Design', 'Web Development', 'Full-Stack Development', 'Power BI', 'Excel for Business',
+    'French as a Second Language', 'Technical Writing', 'Event Management', 'Construction Management', 'GIS',
+    'Nonprofit Management', 'Indigenous Perspectives', 'Teaching Adults', 'Conflict Resolution', 'Public Relations',
+]
+PROGRAM_FORMATS = [
+    '{topic}', '{topic} Certificate', 'Certificate in {topic}', 'Introduction to {topic}', '{topic} Fundamentals',
+    'Advanced {topic}', '{topic} Bootcamp', '{topic} Essentials', '{topic} Micro-credential', 'Applied {topic}',
+    '{topic} for Managers', '{topic}: Level {level}', '{topic} Diploma', '{topic} Workshop',
+]
+CREDENTIAL_TYPES = [
+    ('Certificate', 26), ('Course', 30), ('Micro-credential', 10), ('Diploma', 4), ('Professional Development', 8),
+    ('Workshop', 5), ('Statement of Completion', 3), ('Online Course', 4), ('certificate', 2), ('COURSE ', 1),
+    ('', 4), ('Unknown', 3),
+]
+DELIVERY_MODES = [
+    ('Online', 45), ('In-person', 22), ('Hybrid', 12), ('online', 4), ('Blended', 3), ('Virtual', 3),
+    ('In person', 2), ('', 5), ('Unknown', 4),
+]
+SKILLS = [
+    'Python', 'SQL', 'R', 'Excel', 'Power BI', 'Tableau', 'Machine Learning', 'Statistics', 'Data Visualization',
+    'Cloud Computing', 'AWS', 'Azure', 'Cybersecurity', 'Networking', 'JavaScript', 'React', 'HTML/CSS',
+    'Project Management', 'Agile', 'Scrum', 'Risk Management', 'Budgeting', 'Leadership', 'Communication',
+    'Teamwork', 'Negotiation', 'Conflict Resolution', 'Critical Thinking', 'Problem Solving', 'Coaching',
+    'Digital Marketing', 'SEO', 'Social Media', 'Content Strategy', 'Customer Service', 'Sales', 'Accounting',
+    'Financial Analysis', 'Bookkeeping', 'Payroll', 'Human Resources', 'Recruitment', 'Employment Law',
+    'Health and Safety', 'Mental Health', 'Patient Care', 'Change Management', 'Strategic Planning',
+    'Supply Chain', 'Logistics', 'UX Research', 'Prototyping', 'Technical Writing', 'Public Speaking',
+    'French', 'GIS', 'AutoCAD', 'Facilitation', 'Instructional Design', 'Ethics',
+]
+DESCRIPTION_FORMATS = [
+    'Build practical {topic} skills you can apply at work right away.',
+    'This program introduces the core concepts of {topic}, with hands-on projects and case studies.',
+    'Designed for working professionals, this {topic} offering covers tools, methods, and best practices.',
+    'Learn {topic} from industry practitioners. Includes a capstone project, peer feedback, and "real-world" assignments.',
+    'Gain a recognized credential in {topic}.\nCourses may be taken in any order.',
+    '',
+    'Unknown',
+]
+
+def price_pool(rng, size):
+    """Price strings in the shapes scraped pages use, with their share of blanks and free text"""
+    amounts = np.round(rng.lognormal(6.8, 1.0, size), -1).astype(int)
+    cents = rng.integers(0, 100, size)
+    upper = amounts + np.round(rng.lognormal(6, 0.8, size), -1).astype(int)
+    shapes = [
+        lambda i: f"${amounts[i]:,}",
+        lambda i: f"${amounts[i]:,}.00",
+        lambda i: f"{amounts[i]} CAD",
+        lambda i: f"CAD {amounts[i]:,}",
+        lambda i: f"$ {amounts[i] - 1}.{cents[i]:02d}",
+        lambda i: f"${amounts[i]:,} - ${upper[i]:,}",
+        lambda i: f"From ${amounts[i]:,}",
+        lambda i: f"Starting at ${amounts[i]:,}",
+        lambda i: f"${amounts[i]:,} + HST",
+        lambda i: f"${amounts[i]:,} per course",
+        lambda i: 'Free',
+        lambda i: 'Contact for pricing',
+        lambda i: 'Unknown',
+        lambda i: '',
+    ]
+    weights = np.array([22, 6, 6, 3, 4, 6, 4, 2, 3, 2, 3, 3, 8, 10], dtype=float)
+    picks = rng.choice(len(shapes), size, p=weights / weights.sum())
+    return [shapes[pick](i) for i, pick in enumerate(picks)]
+
+def duration_pool(rng, size):
+    """Duration strings mixing units, ranges and free text"""
+    counts = rng.integers(1, 16, size)
+    shapes = [
+        lambda i: f"{counts[i]} weeks",
+        lambda i: f"{counts[i]} wks",
+        lambda i: f"{counts[i]}-{counts[i] + 2} weeks",
+        lambda i: f"{counts[i] % 12 + 1} months",
+        lambda i: f"{counts[i] * 6} hours",
+        lambda i: f"{counts[i] * 3} hrs",
+        lambda i: f"{counts[i] % 5 + 1} days",
+        lambda i: f"Approx. {counts[i]} weeks",
+        lambda i: '1 year',
+        lambda i: 'Self-paced',
+        lambda i: 'Varies',
+        lambda i: 'Unknown',
+        lambda i: '',
+    ]
+    weights = np.array([25, 5, 6, 12, 12, 4, 5, 3, 3, 6, 3, 6, 10], dtype=float)
+    picks = rng.choice(len(shapes), size, p=weights / weights.sum())
+    return [shapes[pick](i) for i, pick in enumerate(picks)]
+
+def skill_pool(rng, size):
+    """Comma-separated skill lists of varying length, plus blanks"""
+    popularity = 1 / np.arange(1, len(SKILLS) + 1)
+    popularity /= popularity.sum()
+    lists = []
+    for count in rng.integers(0, 7, size):
+        if count == 0:
+            lists.append(rng.choice(['', 'Unknown']))
+        else:
+            lists.append(', '.join(rng.choice(SKILLS, count, replace=False, p=popularity)))
+    return lists
+
+def pick(rng, weighted, size):
+    """size draws from a list of (value, weight) pairs"""
+    values, weights = zip(*weighted)
+    weights = np.array(weights, dtype=float)
+    return np.array(values, dtype=object)[rng.choice(len(values), size, p=weights / weights.sum())]
+
+def generate_chunk(rng, start, rows, pools):
+    """Rows start..start + rows of the raw scrape as a frame in RAW_COLUMNS order"""
+    institution_ids = rng.integers(0, len(INSTITUTIONS), rows)
+    name_ids = rng.integers(0, len(pools['names']), rows)
+    names = pools['names'][name_ids]
+    institutions = np.array([name for name, _ in INSTITUTIONS], dtype=object)[institution_ids]
+    institutions[rng.random(rows) < 0.01] = ''
+    domains = np.array([domain for _, domain in INSTITUTIONS], dtype=object)[institution_ids]
+    ids = pd.Series(np.arange(start, start + rows)).astype(str).to_numpy(dtype=object)
+    urls = 'https://' + domains + '/programs/' + pools['slugs'][name_ids] + '-' + ids
+    days = rng.integers(0, 540, rows)
+    scraped = (np.datetime64('2025-01-01') + days).astype(str).astype(object)
+    scraped[rng.random(rows) < 0.05] = ''
+
+    return pd.DataFrame({
+        'institution': institutions,
+        'program_name': names,
+        'credential_type': pick(rng, CREDENTIAL_TYPES, rows),
+        'delivery_mode': pick(rng, DELIVERY_MODES, rows),
+        'duration': pools['durations'][rng.integers(0, len(pools['durations']), rows)],
+        'skills': pools['skills'][rng.integers(0, len(pools['skills']), rows)],
+        'price': pools['prices'][rng.integers(0, len(pools['prices']), rows)],
+        'description': pools['descriptions'][rng.integers(0, len(pools['descriptions']), rows)],
+        'url': urls,
+        'scraped_date': scraped,
+    }, columns=RAW_COLUMNS)
+
+def build_pools(rng):
+    """Value pools rows are drawn from, so generation stays vectorized"""
+    names = [
+        form.format(topic=topic, level=level)
+        for topic in TOPICS for form in PROGRAM_FORMATS for level in ([1, 2, 3] if '{level}' in form else [None])
+    ]
+    slugs = [''.join(c if c.isalnum() else '-' for c in name.lower()).strip('-') for name in names]
+    descriptions = [
+        form.format(topic=topic) for topic in TOPICS for form in DESCRIPTION_FORMATS
+    ]
+    return {
+        'names': np.array(names, dtype=object),
+        'slugs': np.array(slugs, dtype=object),
+        'descriptions': np.array(descriptions, dtype=object),
+        'prices': np.array(price_pool(rng, 20_000), dtype=object),
+        'durations': np.array(duration_pool(rng, 5_000), dtype=object),
+        'skills': np.array(skill_pool(rng, 20_000), dtype=object),
+    }
+
+def generate_raw_csv(output_path, rows, seed=0, chunk_rows=DEFAULT_CHUNK_ROWS):
+    """Write rows synthetic raw scrape records to output_path, chunk by chunk"""
+    rng = np.random.default_rng(seed)
+    pools = build_pools(rng)
+    with open(output_path, 'w', encoding='utf-8', newline='') as out:
+        for start in range(0, rows, chunk_rows):
+            chunk = generate_chunk(rng, start, min(chunk_rows, rows - start), pools)
+            chunk.to_csv(out, header=False, index=False)
+
+def parse_size(value):
+    """A named size from DATASET_SIZES or a plain row count"""
+    if value.lower() in DATASET_SIZES:
+        return DATASET_SIZES[value.lower()]
+    try:
+        rows = int(value.replace('_', ''))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected one of {', '.join(DATASET_SIZES)} or a row count")
+    if rows < 1:
+        raise argparse.ArgumentTypeError('row count must be at least 1')
+    return rows
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('size', type=parse_size, help=f"{', '.join(DATASET_SIZES)} or a row count")
+    parser.add_argument('-o', '--output', help='CSV to write (default: raw_<size>.csv)')
+    parser.add_argument('--seed', type=int, default=0, help='random seed (default: 0)')
+    args = parser.parse_args(argv)
+
+    output_path = args.output or f"raw_{args.size}.csv"
+    started = time.perf_counter()
+    generate_raw_csv(output_path, args.size, args.seed)
+    print(f"Wrote {args.size:,} rows to {output_path} in {time.perf_counter() - started:.1f}s")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""Preprocess a raw CPE scrape into the CSV format the dashboard loads directly"""
+import argparse
+import os
+import sys
+import time
+import uuid
+import numpy as np
+import pandas as pd
+from credscout_pipeline import (
+    INGEST_WORKERS, QUALITY_COLUMNS, RAW_COLUMNS, assess_data_quality, build_quality_profile,
+    iter_processed_chunks, latest_batch_rows, plan_incremental, process_raw_frame, read_raw_csv,
+    record_offsets
+)
+
+DEFAULT_OUTPUT = 'credscout_processed_data.csv'
+DEFAULT_CHUNK_SIZE = 100_000
+
+# Output column order; the dashboard detects the preprocessed format by program_id/offering_level
+PROCESSED_COLUMNS = [
+    'program_id', 'program_key', 'row_hash', 'title', 'institution', 'credential_type',
+    'offering_level', 'delivery_mode', 'duration_weeks', 'duration_display', 'price_cad',
+    'price_display', 'skills', 'description', 'program_url', 'province', 'data_quality',
+    'date_added', 'program_name', 'duration', 'price', 'url', 'scraped_date'
+]
+CSV_OPTIONS = {'index': False, 'date_format': '%Y-%m-%d %H:%M:%S'}
+
+def write_atomically(output_path, write):
+    """Call write(temp_path), then move the result over output_path
+
+    Writing next to the target and swapping in at the end means a failed run leaves
+    the previous output untouched.
+    """
+    temp_path = f"{output_path}.{uuid.uuid4().hex}.tmp"
+    try:
+        result = write(temp_path)
+        os.replace(temp_path, output_path)
+        return result
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+def preprocess_file(input_path, output_path, chunk_size=DEFAULT_CHUNK_SIZE, workers=INGEST_WORKERS):
+    """Clean a raw scrape chunk by chunk into output_path; returns (rows, quality profile)"""
+    def write(temp_path):
+        rows = 0
+        missing = 0
+        for chunk, profile in iter_processed_chunks(input_path, chunk_size, workers):
+            chunk[PROCESSED_COLUMNS].to_csv(temp_path, mode='a', header=rows == 0, **CSV_OPTIONS)
+            rows += len(chunk)
+            missing = missing + profile['missing'].to_numpy()
+        if rows == 0:
+            pd.DataFrame(columns=PROCESSED_COLUMNS).to_csv(temp_path, index=False)
+        return rows, build_quality_profile(missing, rows)
+
+    return write_atomically(output_path, write)
+
+def preprocess_incremental(input_path, output_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Merge new or changed programs from a raw scrape into an existing processed CSV
+
+    Only rows whose program_key is new, or whose raw content changed, are cleaned.
+    Changed programs are rewritten in place with their program_id; new programs are
+    appended with fresh ids; every other record is copied unchanged. Returns the number
+    of programs added and changed, and the total rows.
+    """
+    try:
+        store = pd.read_csv(
+            output_path, usecols=['program_id', 'program_key', 'row_hash'],
+            dtype={'program_key': 'uint64', 'row_hash': 'uint64'}
+        )
+    except ValueError:
+        raise ValueError(f"{output_path} has no program_key/row_hash columns; rebuild it without --incremental")
+    store_keys = store['program_key'].to_numpy()
+    store_hashes = store['row_hash'].to_numpy()
+    store_ids = store['program_id'].to_numpy()
+    del store
+
+    # Collect the delta as raw text; it is cleaned in one pass at the end
+    batch = latest_batch_rows(read_raw_csv(input_path, chunksize=chunk_size))
+    changed, positions, added = plan_incremental(store_keys, store_hashes, batch)
+    delta = pd.concat([changed.assign(store_position=positions), added.assign(store_position=-1)], ignore_index=True)
+    del batch, changed, added
+    positions = delta['store_position'].to_numpy()
+    delta, _ = process_raw_frame(delta[RAW_COLUMNS].reset_index(drop=True))
+
+    is_new = positions < 0
+    next_id = int(store_ids.max()) + 1 if len(store_ids) else 1
+    delta['program_id'] = np.where(is_new, next_id + np.cumsum(is_new) - 1, store_ids[np.maximum(positions, 0)])
+    order = np.argsort(positions[~is_new])
+    replaced_positions = positions[~is_new][order]
+    replacements = as_csv_bytes(delta[~is_new].iloc[order])
+    appended = as_csv_bytes(delta[is_new])
+
+    def write(temp_path):
+        # Unchanged records are copied byte for byte; record i + 1 is data row i
+        existing = np.memmap(output_path, dtype=np.uint8, mode='r')
+        offsets = record_offsets(existing) if len(replaced_positions) else None
+        replacement_offsets = record_offsets(np.frombuffer(replacements, dtype=np.uint8))
+        with open(temp_path, 'wb') as out:
+            copied = 0
+            for i, position in enumerate(replaced_positions):
+                copy_bytes(existing, copied, offsets[position + 1], out)
+                out.write(replacements[replacement_offsets[i]:replacement_offsets[i + 1]])
+                copied = offsets[position + 2]
+            copy_bytes(existing, copied, len(existing), out)
+            out.write(appended)
+
+    write_atomically(output_path, write)
+    return int(is_new.sum()), len(replaced_positions), len(store_ids) + int(is_new.sum())
+
+def as_csv_bytes(df):
+    """Processed rows as headerless CSV records, formatted like the full output"""
+    return df[PROCESSED_COLUMNS].to_csv(header=False, **CSV_OPTIONS).encode('utf-8')
+
+def copy_bytes(data, start, end, out, block_bytes=16 * 2**20):
+    """Write data[start:end] to out in bounded blocks"""
+    for position in range(start, end, block_bytes):
+        out.write(data[position:min(position + block_bytes, end)].tobytes())
+
+def quality_profile_of(path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """Per-column completeness of a processed CSV, read chunk by chunk"""
+    rows = 0
+    missing = 0
+    header = pd.read_csv(path, nrows=0).columns
+    columns = [column for column in QUALITY_COLUMNS if column in header]
+    for chunk in pd.read_csv(path, usecols=columns, dtype=str, chunksize=chunk_size):
+        rows += len(chunk)
+        missing = missing + assess_data_quality(chunk)[1]['missing'].to_numpy()
+    return build_quality_profile(missing, rows)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('input', help='raw headerless scrape CSV')
+    parser.add_argument('-o', '--output', default=DEFAULT_OUTPUT, help=f'processed CSV to write (default: {DEFAULT_OUTPUT})')
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help=f'rows per chunk in single-process mode (default: {DEFAULT_CHUNK_SIZE})')
+    parser.add_argument(
+        '--workers', type=int,
+        help=f'worker processes for a full rebuild; 1 cleans in a single process (default: {INGEST_WORKERS})'
+    )
+    parser.add_argument(
+        '--incremental', action='store_true',
+        help='merge only new or changed programs into an existing output, keeping program_ids'
+    )
+    args = parser.parse_args(argv)
+    if args.chunk_size < 1:
+        parser.error('--chunk-size must be at least 1')
+    if args.workers is not None and args.workers < 1:
+        parser.error('--workers must be at least 1')
+    # An incremental merge cleans only its delta, in a single process
+    if args.incremental and args.workers is not None:
+        parser.error('--workers cannot be combined with --incremental')
+
+    started = time.perf_counter()
+    if args.incremental and os.path.exists(args.output):
+        try:
+            added, changed, rows = preprocess_incremental(args.input, args.output, args.chunk_size)
+        except ValueError as e:
+            parser.error(str(e))
+        quality_profile = quality_profile_of(args.output, args.chunk_size)
+        summary = f"Added {added:,} and updated {changed:,} programs in {args.output} ({rows:,} total)"
+    else:
+        rows, quality_profile = preprocess_file(args.input, args.output, args.chunk_size, args.workers or INGEST_WORKERS)
+        summary = f"Processed {rows:,} programs into {args.output}"
+    elapsed = time.perf_counter() - started
+
+    print(f"{summary} in {elapsed:.1f}s")
+    for column, completeness in quality_profile['completeness'].items():
+        status = 'no rows' if np.isnan(completeness) else f"{completeness:.0%} complete"
+        print(f"  {column:<16} {status}")
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,21 @@
+import numpy as np
+from credscout_api import CatalogService, json_value
+from credscout_core import process_upload
+from preprocess_cpe_data import preprocess_file
+
+def test_json_value_rounds_widened_float32():
+    assert json_value(np.float32(829.43)) == 829.43
+    assert json_value(float(np.float32(0.3))) == 0.3
+    assert json_value(np.float64('nan')) is None
+    assert json_value(np.int64(3)) == 3 and isinstance(json_value(np.int64(3)), int)
+
+def test_catalog_service_on_header_only_file(tmp_path):
+    raw = tmp_path / 'raw.csv'
+    raw.write_text('')
+    preprocess_file(str(raw), str(tmp_path / 'processed.csv'), workers=1)
+    with open(tmp_path / 'processed.csv', 'rb') as f:
+        df, _ = process_upload(f)
+    service = CatalogService(df)
+    result = service.query({'search': 'python'})
+    assert result['summary']['total'] == 0
+    assert result['skills'] == [] and result['price'] == {'count': 0}
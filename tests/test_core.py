@@ -0,0 +1,130 @@
+import io
+import numpy as np
+import pandas as pd
+import pytest
+import credscout_core
+from credscout_core import (
+    SEARCH_FIELDS, SKETCH_RELATIVE_ACCURACY, FilterEngine, ProgramLookup, QuantileSketch, SearchIndex,
+    SelectionCache, grouped_box_stats, selection_aggregates, cached_tab_content, iter_export_chunks,
+    process_upload
+)
+
+def frame(prices, durations):
+    rows = len(prices)
+    return pd.DataFrame({
+        'offering_level': pd.Categorical(['course', 'certificate'] * (rows // 2) + ['course'] * (rows % 2)),
+        'credential_type': pd.Categorical(['Course'] * rows),
+        'institution': pd.Categorical(['A', 'B'] * (rows // 2) + ['A'] * (rows % 2)),
+        'delivery_mode': pd.Categorical(['Online'] * rows),
+        'data_quality': pd.Categorical(['good'] * rows),
+        'price_cad': pd.array(prices, dtype='float32'),
+        'duration_weeks': pd.array(durations, dtype='float32'),
+    })
+
+@pytest.mark.parametrize('values', [np.array([], dtype='float64'), np.full(50, np.nan)])
+def test_sketch_without_values_gives_nan_quantiles(values):
+    sketch = QuantileSketch(values)
+    counts = sketch.counts(groups=np.zeros(len(values), dtype=np.int32), group_count=2)
+    assert counts.sum() == 0
+    assert np.isnan(sketch.quantiles(counts, [0.25, 0.5, 0.75])).all()
+
+def test_sketch_quantiles_within_relative_accuracy():
+    values = np.random.default_rng(0).lognormal(7, 1, 10_000)
+    values[:100] = 0
+    sketch = QuantileSketch(values)
+    estimated = sketch.quantiles(sketch.counts(), [0.1, 0.5, 0.9])[0]
+    exact = np.quantile(values, [0.1, 0.5, 0.9], method='lower')
+    assert np.all(np.abs(estimated - exact) <= 2 * SKETCH_RELATIVE_ACCURACY * exact)
+
+def test_filter_engine_on_columns_without_values():
+    df = frame([np.nan] * 50, [np.nan] * 50)
+    engine = FilterEngine(df)
+    rows = np.arange(len(df))
+    assert engine.bounds('price_cad') is None
+    assert np.isnan(engine.quantiles('price_cad', rows, [0.5])[0, 0])
+    assert np.isnan(selection_aggregates(engine, rows)['median_price'])
+    assert grouped_box_stats(engine, rows, 'price_cad', 'offering_level') == []
+
+def test_filter_engine_on_empty_frame():
+    engine = FilterEngine(frame([], []))
+    assert engine.bounds('duration_weeks') is None
+    assert np.isnan(engine.quantiles('duration_weeks', np.array([], dtype=np.int64), [0.5])[0, 0])
+
+@pytest.mark.parametrize('rows, text', [(0, 'Python'), (3, ''), (3, '  ')])
+def test_search_index_without_tokens(rows, text):
+    df = pd.DataFrame({field: pd.Series([text] * rows, dtype='str') for field in SEARCH_FIELDS})
+    index = SearchIndex(df)
+    assert len(index.search('python')) == 0
+    assert len(index.search('data science')) == 0
+
+def test_search_index_update_matches_rebuild():
+    df = pd.DataFrame({field: pd.Series(
+        [f'Python {field} {n % 7}' for n in range(40)], dtype='str'
+    ) for field in SEARCH_FIELDS})
+    rebuilt = SearchIndex(df)
+    changed = df.copy()
+    changed.loc[3, 'title'] = 'Rust systems'
+    # Deltas with and without new terms, and with appended rows
+    for base, frame, changed_rows in [
+        (rebuilt, df, [0, 1]), (SearchIndex(df.iloc[:30]), df, [2]), (rebuilt, changed, [3]),
+    ]:
+        updated = base.updated(frame, changed_rows)
+        for query in ['python', 'title 3', 'rust', 'systems', 'description']:
+            assert np.array_equal(updated.search(query), SearchIndex(frame).search(query))
+
+def test_program_lookup_matches_only_given_rows():
+    titles = [f'Data Analytics {n}' for n in range(30)] + ['Applied Data Science', 'Big Data Tools']
+    lookup = ProgramLookup(pd.DataFrame({'title': titles, 'program_id': np.arange(len(titles)) + 1}))
+    assert len(lookup.matches('data')) == 20
+    # Filtered-out prefix matches do not use up the limit ahead of allowed substring matches
+    rows = np.array([3, 30, 31])
+    assert sorted(lookup.matches('data', rows=rows)) == [4, 31, 32]
+    assert sorted(lookup.matches('data', limit=2, rows=rows)) == [4, 31]
+    assert len(lookup.matches('data', rows=np.array([], dtype=np.int64))) == 0
+
+def test_selection_cache_counts_attached_content():
+    cache = SelectionCache(max_bytes=50_000)
+    for key in ('a', 'b'):
+        cache.put(key, {'rows': np.arange(1_000, dtype=np.int32), 'aggregates': {}})
+    size = cache.size_bytes
+    assert cached_tab_content(cache, 'b', 'overview', lambda: np.zeros(1_000)) is not None
+    assert cache.size_bytes == size + 8_000
+    assert cache.part('b', 'overview') is not None
+    # Replacing content charges only the difference, and overflow evicts the oldest entry
+    cache.attach('b', 'overview', np.zeros(5_000))
+    assert cache.get('a') is None
+    assert cache.size_bytes == cache.entries['b']['bytes'] <= cache.max_bytes
+
+def test_export_chunks_take_rows_then_columns():
+    df = frame(list(range(10)), list(range(10, 20)))
+    rows = np.array([7, 2, 5, 9, 0])
+    chunks = list(iter_export_chunks(df, ['duration_weeks', 'institution'], rows, chunk_rows=2))
+    assert [len(chunk) for chunk in chunks] == [2, 2, 1]
+    pd.testing.assert_frame_equal(pd.concat(chunks), df.iloc[rows][['duration_weeks', 'institution']])
+
+def processed_csv():
+    df = frame([100.0, np.nan], [4.0, 12.0]).assign(
+        program_id=[1, 2], title=['A', 'B'], date_added=['2024-01-01', ''],
+        skills=['Python', 'Unknown'], description=['x', ''], duration=['4 weeks', '12 weeks'], price=['$100', '']
+    )
+    return df.to_csv(index=False).encode('utf-8')
+
+def test_process_upload_reads_preprocessed_files():
+    df, quality_profile = process_upload(io.BytesIO(processed_csv()))
+    assert df['program_id'].tolist() == [1, 2]
+    assert isinstance(df['institution'].dtype, pd.CategoricalDtype)
+    assert quality_profile.loc['price', 'missing'] == 1
+
+def test_process_upload_surfaces_quality_errors(monkeypatch):
+    def fail(df):
+        raise RuntimeError('quality bug')
+    monkeypatch.setattr(credscout_core, 'assess_data_quality', fail)
+    with pytest.raises(RuntimeError, match='quality bug'):
+        process_upload(io.BytesIO(processed_csv()))
+
+def test_process_upload_surfaces_schema_errors(monkeypatch):
+    def fail(df):
+        raise TypeError('schema bug')
+    monkeypatch.setattr(credscout_core, 'apply_compact_schema', fail)
+    with pytest.raises(TypeError, match='schema bug'):
+        process_upload(io.BytesIO(processed_csv()))
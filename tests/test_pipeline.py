@@ -0,0 +1,111 @@
+import csv
+import io
+import numpy as np
+import pandas as pd
+import pytest
+import credscout_pipeline
+from credscout_pipeline import (
+    OFFERING_LEVEL_RULES, QUALITY_COLUMNS, assess_data_quality, categorize_offering_level,
+    clean_duration, clean_price, compile_offering_level_rules, count_quotes, iter_processed_chunks,
+    next_record_start, normalize_duration_series, parse_price_series, process_raw_bytes,
+    record_offsets, shard_offsets
+)
+
+# Range and 'from $X' prices are left out: parse_price_series reads them, clean_price does not
+MESSY_PRICES = [
+    '$1,299.00', '1299', '$ 450 CAD', '2,500cad', '$0', '-75', '.5', '12.', '1e3', 'Free',
+    'Contact us', 'Unknown', '', '$', None, np.nan, '$1,299.00', 'TBD CAD', '3 500',
+]
+MESSY_DURATIONS = [
+    '12 weeks', '3 Months', '1.5 years', '10 days', '40 hours', '6-8 weeks', 'Week 3',
+    '2 weekdays', 'Self-paced', '5', 'Unknown', '', None, np.nan, '12 weeks', '0.5 Year',
+]
+
+@pytest.mark.parametrize('dtype', [object, 'str'])
+def test_parse_price_series_matches_clean_price(dtype):
+    prices = pd.Series(MESSY_PRICES, dtype=dtype)
+    expected = pd.Series([clean_price(p) for p in prices], dtype='float64')
+    pd.testing.assert_series_equal(parse_price_series(prices), expected)
+
+@pytest.mark.parametrize('dtype', [object, 'str'])
+def test_normalize_duration_series_matches_clean_duration(dtype):
+    durations = pd.Series(MESSY_DURATIONS, dtype=dtype)
+    expected = pd.Series([clean_duration(d) for d in durations], dtype='float64')
+    pd.testing.assert_series_equal(normalize_duration_series(durations), expected)
+
+def test_offering_level_rules_match_categorize_offering_level():
+    prices = [np.nan, 0, 100, 499, 500, 999, 1000, 2000, 2500, 5000, 6000]
+    durations = [np.nan, 0, 1, 2, 12, 24, 30]
+    credential_types = ['Course', 'Certificate', 'Micro-credential', 'Professional Development',
+                        'Statement of Completion', 'Diploma', 'Unknown', np.nan]
+    df = pd.DataFrame(
+        [(c, p, d) for c in credential_types for p in prices for d in durations],
+        columns=['credential_type', 'price_cad', 'duration_weeks']
+    )
+    expected = df.apply(categorize_offering_level, axis=1).rename('offering_level')
+    pd.testing.assert_series_equal(compile_offering_level_rules(OFFERING_LEVEL_RULES)(df), expected)
+
+def test_data_quality_scores_rows_and_profiles_columns():
+    df = pd.DataFrame({column: ['x', 'Unknown', None, ''] for column in QUALITY_COLUMNS})
+    df.loc[0, 'price'] = 'Unknown'
+    quality, profile = assess_data_quality(df)
+    assert quality.tolist() == ['good', 'poor', 'poor', 'poor']
+    assert profile.loc['price', 'missing'] == 4 and profile.loc['price', 'completeness'] == 0
+    assert profile.loc['skills', 'completeness'] == 0.25
+
+def test_data_quality_of_no_rows_is_not_complete():
+    quality, profile = assess_data_quality(pd.DataFrame(columns=QUALITY_COLUMNS, dtype=object))
+    assert len(quality) == 0
+    assert (profile['missing'] == 0).all() and profile['completeness'].isna().all()
+
+def tricky_raw_csv(rows=60):
+    """Raw scrape bytes with quoted commas, doubled quotes and line breaks in fields, and the
+    offset of each record start followed by the end"""
+    descriptions = ['Plain text', 'Labs, projects and "capstone"', 'Line one\nline two, "quoted"\n', '"', '']
+    records = []
+    for n in range(rows):
+        out = io.StringIO()
+        csv.writer(out, lineterminator='\n').writerow([
+            f'Inst {n % 3}', f'Program, part {n}', 'Certificate', 'Online', f'{n % 12 + 1} weeks',
+            'Python, SQL', f'${n * 10:,}', descriptions[n % len(descriptions)], f'https://x/{n}', '2024-01-01',
+        ])
+        records.append(out.getvalue().encode('utf-8'))
+    return b''.join(records), np.cumsum([0] + [len(record) for record in records])
+
+@pytest.mark.parametrize('block_bytes', [3, 64, 2**20])
+def test_record_offsets_follow_quoted_fields(block_bytes):
+    data, starts = tricky_raw_csv()
+    offsets = record_offsets(np.frombuffer(data, dtype=np.uint8), block_bytes)
+    assert np.array_equal(offsets, starts)
+
+@pytest.mark.parametrize('block_bytes', [5, 1 << 16])
+def test_next_record_start_skips_newlines_inside_quotes(block_bytes):
+    data, starts = tricky_raw_csv(20)
+    view = np.frombuffer(data, dtype=np.uint8)
+    for position in range(len(data)):
+        start, quotes = next_record_start(view, position, count_quotes(view, 0, position), block_bytes)
+        assert start == starts[np.searchsorted(starts, position, side='right')]
+        assert quotes == count_quotes(view, 0, start)
+
+def test_shard_offsets_split_on_record_starts():
+    data, starts = tricky_raw_csv()
+    view = np.frombuffer(data, dtype=np.uint8)
+    for shard_count in range(1, 40):
+        ranges = shard_offsets(view, shard_count)
+        assert ranges[0][0] == 0 and ranges[-1][1] == len(data)
+        assert all(end == next_start for (_, end), (next_start, _) in zip(ranges, ranges[1:]))
+        assert all(start < end and start in starts for start, end in ranges)
+
+def test_parallel_ingestion_matches_single_process(tmp_path, monkeypatch):
+    monkeypatch.setattr(credscout_pipeline, 'PARALLEL_MIN_BYTES', 0)
+    data, _ = tricky_raw_csv(200)
+    path = tmp_path / 'raw.csv'
+    path.write_bytes(data)
+    expected, expected_profile = process_raw_bytes(data, workers=1)
+
+    df, profile = process_raw_bytes(data, workers=3)
+    pd.testing.assert_frame_equal(df, expected)
+    pd.testing.assert_frame_equal(profile, expected_profile)
+    chunks = list(iter_processed_chunks(str(path), chunk_size=1000, workers=2, shard_bytes=1000))
+    assert len(chunks) > 2
+    pd.testing.assert_frame_equal(pd.concat([chunk for chunk, _ in chunks], ignore_index=True), expected)
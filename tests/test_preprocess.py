@@ -0,0 +1,61 @@
+import csv
+import pytest
+from credscout_pipeline import RAW_COLUMNS
+from preprocess_cpe_data import main, preprocess_file, preprocess_incremental
+
+def raw_row(n, price='$1,000', description='Hands-on labs'):
+    return [
+        'Inst A' if n % 2 else 'Inst B', f'Program {n}', 'Certificate', 'Online', f'{n % 20 + 1} weeks',
+        'Python, SQL', price, description, f'https://x/{n}', '2024-01-01',
+    ]
+
+def write_raw(path, rows):
+    assert all(len(row) == len(RAW_COLUMNS) for row in rows)
+    with open(path, 'w', newline='') as f:
+        csv.writer(f).writerows(rows)
+    return str(path)
+
+def read_bytes(path):
+    with open(path, 'rb') as f:
+        return f.read()
+
+STORE_ROWS = [raw_row(n) for n in range(30)] + [raw_row(30, '$2,860', 'Line one\nline, "two"')]
+BATCH_ROWS = (
+    # A changed row for 30, then its original row again later: the last row wins
+    [raw_row(30, '$1')]
+    + [raw_row(n) for n in range(10)]
+    + [raw_row(5, '$5,500'), raw_row(40, 'Free', 'New,\nquoted'), raw_row(41)]
+    + [raw_row(n) for n in range(10, 20)]
+    + [raw_row(30, '$2,860', 'Line one\nline, "two"'), raw_row(7, '$750')]
+)
+
+def test_incremental_matches_full_rebuild_for_any_chunk_size(tmp_path):
+    # Full rebuild: store rows with the batch's last row per program applied, new programs appended
+    merged = {row[8]: row for row in STORE_ROWS}
+    for row in BATCH_ROWS:
+        merged[row[8]] = row
+    rebuilt = tmp_path / 'rebuilt.csv'
+    preprocess_file(write_raw(tmp_path / 'merged_raw.csv', list(merged.values())), rebuilt, workers=1)
+
+    store_raw = write_raw(tmp_path / 'store_raw.csv', STORE_ROWS)
+    batch_raw = write_raw(tmp_path / 'batch_raw.csv', BATCH_ROWS)
+    for chunk_size in (1, 3, 1000):
+        output = tmp_path / f'incremental_{chunk_size}.csv'
+        preprocess_file(store_raw, output, workers=1)
+        added, changed, rows = preprocess_incremental(batch_raw, output, chunk_size)
+        assert (added, changed, rows) == (2, 2, 33)
+        assert read_bytes(output) == read_bytes(rebuilt)
+
+def test_incremental_without_changes_copies_the_store(tmp_path):
+    store_raw = write_raw(tmp_path / 'store_raw.csv', STORE_ROWS)
+    output = tmp_path / 'processed.csv'
+    preprocess_file(store_raw, output, workers=1)
+    before = read_bytes(output)
+    assert preprocess_incremental(store_raw, output, 7) == (0, 0, len(STORE_ROWS))
+    assert read_bytes(output) == before
+
+def test_workers_rejected_with_incremental(tmp_path, capsys):
+    store_raw = write_raw(tmp_path / 'store_raw.csv', STORE_ROWS)
+    with pytest.raises(SystemExit):
+        main([store_raw, '-o', str(tmp_path / 'out.csv'), '--incremental', '--workers', '2'])
+    assert '--workers cannot be combined with --incremental' in capsys.readouterr().err